@@ -0,0 +1,108 @@
+"""Background batch downloads for the Streamlit app.
+
+``BatchJob`` runs ``TranscriptPipeline.run`` (lazy playlist expansion, the
+ordered download pool, one render per format) on a daemon thread and
+collects every output into an in-memory zip.  The page never waits on it:
+each rerun reads a ``progress()`` snapshot, and the zip is available from
+``zip_bytes()`` once the job has finished (copied out of the buffer once).
+"""
+
+import io
+import threading
+import time
+import zipfile
+from typing import Iterable, List, Optional
+
+from transcript_pipeline import TranscriptPipeline, sanitize_filename
+
+
+class BatchJob:
+    """One batch run: video IDs and playlist URLs in, a zip of outputs out."""
+
+    def __init__(self, inputs: Iterable[str], language: str, export_formats: List[str],
+                 workers: int = 4, limit: Optional[int] = None, segment_mode: str = "auto"):
+        self.pipeline = TranscriptPipeline(language, export_formats, segment_mode, workers)
+        self._inputs = list(inputs)
+        self._limit = limit
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._buffer = io.BytesIO()
+        self._names = set()
+        self._zip: Optional[bytes] = None
+        self.rows: List[dict] = []
+        self.error: Optional[str] = None
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self._thread = threading.Thread(target=self._run, name="streamlit-batch", daemon=True)
+
+    def start(self) -> "BatchJob":
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Stops after the downloads already in flight."""
+        self._cancel.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def _unique_name(self, filename: str) -> str:
+        name, n = filename, 1
+        while name in self._names:
+            n += 1
+            name = f"{filename}_{n}"
+        self._names.add(name)
+        return name
+
+    def _run(self):
+        try:
+            with zipfile.ZipFile(self._buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+                outcomes = self.pipeline.run(self._inputs, self._limit)
+                for result, video_info, rendered in outcomes:
+                    row = {"video_id": result["video_id"], "title": "", "status": result["status"],
+                           "message": result["message"].strip()}
+                    if rendered is not None and rendered[0] == "ok":
+                        row["title"] = video_info["title"]
+                        filename = self._unique_name(sanitize_filename(video_info["title"]) or result["video_id"])
+                        for extension, content in rendered[1]:
+                            archive.writestr(f"{filename}.{extension}", content)
+                        row["message"] = f"✅ {filename}"
+                    elif rendered is not None:
+                        row["status"] = "error"
+                        row["message"] = f"❌ Could not render video {result['video_id']}: {rendered[2]}"
+                    with self._lock:
+                        self.rows.append(row)
+                    if self._cancel.is_set():
+                        outcomes.close()
+                        break
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._zip = self._buffer.getvalue()
+            self._buffer = None
+            self.finished = time.time()
+
+    def progress(self) -> dict:
+        """Snapshot for the page: counts, throughput and the per-video rows."""
+        with self._lock:
+            rows = list(self.rows)
+        elapsed = (self.finished or time.time()) - self.started
+        done = len(rows)
+        return {
+            "done": done,
+            "saved": sum(1 for row in rows if row["status"] == "ok"),
+            "failed": sum(1 for row in rows if row["status"] != "ok"),
+            "elapsed": elapsed,
+            "per_minute": done / elapsed * 60 if elapsed > 0 else 0.0,
+            "rows": rows,
+            "running": self.running,
+            "cancelled": self._cancel.is_set(),
+            "error": self.error,
+        }
+
+    def zip_bytes(self) -> Optional[bytes]:
+        """The zipped outputs, once the job has finished."""
+        if self.running:
+            return None
+        return self._zip
@@ -1,175 +1,407 @@
 import argparse
-import json
-import re
 import os
-from typing import List, Optional
-import yt_dlp
-from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled, VideoUnavailable
-import requests
-# Assuming transcript_helper.py is in the same directory
-from transcript_helper import get_transcript_with_fallback
-
-
-def sanitize_filename(title: str) -> str:
-    """Sanitizes a string to be a valid filename."""
-    s = re.sub(r'[\\/*?:"<>|]', "", title)
-    s = s.replace(" ", "_")
-    return s
-
-def get_video_info(video_id: str) -> dict:
-    """Fetches video info using noembed.  Returns a dictionary."""
-    try:
-        url = f"https://noembed.com/embed?url=https://www.youtube.com/watch?v={video_id}"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        return {
-            "title": data.get("title", "Unknown Title"),
-            "author_name": data.get("author_name", "Unknown Channel")
-        }
-    except requests.RequestException:
-        return {
-            "title": "Unknown Title",
-            "author_name": "Unknown Channel"
-        }
-
-def process_transcript(transcript: List[dict]) -> List[str]:
-    """Processes the transcript into paragraphs."""
-    full_text = ' '.join([fragment['text'] for fragment in transcript])
-    full_text = re.sub(r'\[?[0-9]+:[0-9]+\]?', '', full_text)
-    sentences = re.split(r'(?<=[.!?]) +', full_text)
-
-    paragraphs = []
-    current_paragraph = []
-    for sentence in sentences:
-        current_paragraph.append(sentence)
-        if len(current_paragraph) >= 3:
-            paragraphs.append(' '.join(current_paragraph))
-            current_paragraph = []
-    if current_paragraph:
-        paragraphs.append(' '.join(current_paragraph))
-    return paragraphs
-
-def extract_video_id(url: str) -> Optional[str]:
-    """Extracts the video ID from a YouTube URL, or returns None."""
-    if re.match(r'^[a-zA-Z0-9_-]{11}$', url):
-        return url
-
-    regex_patterns = [
-        r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?(?:www\.)?youtu\.be/([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?(?:www\.)?youtube\.com/embed/([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?(?:www\.)?youtube\.com/v/([a-zA-Z0-9_-]{11})'
-    ]
-
-    for pattern in regex_patterns:
-        match = re.match(pattern, url)
-        if match:
-            return match.group(1)
-    return None
-
-
-def save_transcript(formatted_transcript: str, filename: str, extension: str, output_directory: str):
-    """Saves the transcript to a file."""
-    file_path = os.path.join(output_directory, f"{filename}.{extension}")
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(formatted_transcript)
-
-def get_playlist_video_ids(playlist_url: str) -> List[str]:
-    """Extracts video IDs from a YouTube playlist using yt-dlp."""
-    try:
-        ydl_opts = {
-            'quiet': True,
-            'extract_flat': True,
-            'dump_single_json': True,
-            'playlistend': 500,
-        }
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            result = ydl.extract_info(playlist_url, download=False)
-            if 'entries' in result:
-                return [entry['id'] for entry in result['entries'] if entry]
-            else:
-                return []
-    except yt_dlp.utils.DownloadError as e:
-        print(f"Error extracting playlist: {e}")
-        return []
-    except Exception as e:
-        print(f"An unexpected error occurred while extracting playlist: {e}")
-        return[]
+import sys
+import time
+import itertools
+from typing import Callable, Iterable, List, Optional, Sequence, Union
+from transcript_pipeline import (  # noqa: F401 - playlist helpers re-exported for existing callers
+    TranscriptPipeline,
+    extract_video_id,
+    get_playlist_entries,
+    get_playlist_video_ids,
+    is_collection_url,
+    iter_playlist_entries,
+    mark_failed,
+    new_result,
+    sanitize_filename,
+)
+from transcript_text import SEGMENT_MODES
+from transcript_render import FORMATS
+import profiling
+import run_metrics
+import transcript_cache
+from job_journal import JobJournal
+from output_sinks import SINK_FILES, DirectorySink, OutputSink, open_sink, save_transcript  # noqa: F401
+from search_index import SearchIndex
+from sync_state import SyncState
+from transcript_archive import ARCHIVE_NAME, TranscriptArchive, render_archived_chunk
+from transcript_helper import TRACK_STEPS
 
+REPORT_NAME = ".yt2md-report.json"
 
-def download_single_transcript(video_id: str, language: str, export_format: str, output_dir: str):
-    """Downloads and saves a single transcript."""
+
+def _write_rendered(result: dict, video_info: dict, rendered: tuple, sink: OutputSink):
+    """Writer stage: hands the outputs produced by ``render_chunk`` to *sink*.
+    A failed write fails this video only, not the batch."""
+    if rendered[0] == "error":
+        mark_failed(result, rendered[1], f"❌ Could not render video {result['video_id']}: {rendered[2]}")
+        return
+    run_metrics.record("render", rendered[2])
+    outputs = rendered[1]
     try:
-        transcript = get_transcript_with_fallback(video_id, language)
-        video_info = get_video_info(video_id)  # Use your existing function
-        video_title = video_info['title']
-        filename = sanitize_filename(video_title)
-        paragraphs = process_transcript(transcript) #processes transcript
-
-        if export_format == "Markdown":
-            formatted_transcript = f"# {video_title}\n\n"
-            formatted_transcript += "\n\n".join(paragraphs)
-            extension = "md"
-        elif export_format == "Plain Text":
-            formatted_transcript = f"{video_title}\n\n"
-            formatted_transcript += "\n\n".join(paragraphs)
-            extension = "txt"
-        else:  # JSON
-            formatted_transcript = json.dumps({
-                "title": video_info['title'],
-                "author": video_info['author_name'],
-                "paragraphs": paragraphs
-            }, indent=2, ensure_ascii=False)
-            extension = "json"
-
-        save_transcript(formatted_transcript, filename, extension, output_dir)
-        print(f"\n✅ Transcript saved as {filename}.{extension} in {output_dir}")
-
-    except VideoUnavailable:
-        print(f"❌ Video {video_id} is unavailable.")
-    except TranscriptsDisabled:
-        print(f"❌ Transcripts are disabled for video {video_id}.")
-    except NoTranscriptFound:
-        print(f"❌ No transcripts found for the selected language for video {video_id}.")
+        filename = sink.name_for(result["video_id"], video_info)
+        result["paths"].extend(sink.write(result["video_id"], filename, video_info, outputs))
     except Exception as e:
-        print(f"❌ An unexpected error occurred for video {video_id}: {e}")
+        mark_failed(result, type(e).__name__, f"❌ Could not save video {result['video_id']}: {e}")
+        return
+    saved = ", ".join(f"{filename}.{extension}" for extension, _ in outputs)
+    result["message"] = f"\n✅ Transcript saved as {saved} in {sink.location}"
+
+
+def _download_single(video_id: str, language: str, export_formats: List[str], output_dir: str,
+                     entry: Optional[dict] = None, segment_mode: str = "auto",
+                     archive: Optional[TranscriptArchive] = None, sink: Optional[OutputSink] = None,
+                     index: Optional[SearchIndex] = None, tracks: Sequence[str] = TRACK_STEPS) -> dict:
+    """Fetches, renders and saves one transcript without printing.
+
+    The transcript is fetched and segmented once and rendered into every
+    format in ``export_formats`` (extensions from ``transcript_render.FORMATS``).
+    See ``TranscriptPipeline.fetch`` for ``entry``, ``archive`` and ``index``,
+    and ``transcript_helper.TrackPolicy`` for ``tracks``.  Outputs go to
+    *sink*, by default one file per format in *output_dir*.
+
+    Returns a per-video result dict (see ``transcript_pipeline.new_result``).
+    """
+    pipeline = TranscriptPipeline(language, export_formats, segment_mode, archive=archive, index=index, tracks=tracks)
+    result, video_info, rendered = pipeline.process(video_id, entry)
+    if rendered is not None:
+        target = sink or DirectorySink(output_dir)
+        _write_rendered(result, video_info, rendered, target)
+        if sink is None:
+            target.close()
+        else:
+            target.flush()
+    return result
+
+
+def download_single_transcript(video_id: str, language: str, export_formats: List[str], output_dir: str,
+                               segment_mode: str = "auto", archive: Optional[TranscriptArchive] = None,
+                               sink: Optional[OutputSink] = None, index: Optional[SearchIndex] = None,
+                               tracks: Sequence[str] = TRACK_STEPS) -> dict:
+    """Downloads and saves a single transcript, printing the outcome."""
+    result = _download_single(video_id, language, export_formats, output_dir,
+                              segment_mode=segment_mode, archive=archive, sink=sink, index=index,
+                              tracks=tracks)
+    print(result["message"])
+    return result
+
+
+def process_batch(video_ids: Iterable[Union[str, dict]], language: str, export_formats: List[str], output_dir: str,
+                  workers: int = 1, journal: Optional[JobJournal] = None, resume: bool = False,
+                  limit: Optional[int] = None, segment_mode: str = "auto",
+                  archive: Optional[TranscriptArchive] = None, render_processes: int = 0,
+                  sink: Optional[OutputSink] = None, index: Optional[SearchIndex] = None,
+                  on_saved: Optional[Callable[[dict], None]] = None,
+                  tracks: Sequence[str] = TRACK_STEPS) -> List[dict]:
+    """Processes a batch of video IDs, optionally on a pool of ``workers`` threads.
 
+    Items may also be playlist entries from ``iter_playlist_entries``, whose
+    metadata is reused instead of asking noembed.  *video_ids* may be a lazy
+    iterator; it is consumed as the pool frees up rather than up front, and
+    playlist links are expanded (at most *limit* videos each) while earlier
+    videos download.
+
+    Results are reported (and returned) in input order regardless of which
+    video finishes first, so the output is the same for any worker count.
+    Every result is appended to ``journal`` when given; with ``resume`` the
+    videos the journal already records as saved are skipped.
+
+    With ``render_processes`` > 0, segmentation and rendering move off the
+    fetch threads onto that many processes (see ``TranscriptPipeline.run``).
+    Fetched transcripts also go to ``archive`` and the search ``index``
+    when given.  Outputs are always written here, on the calling thread, as results
+    arrive, to *sink* (default: one file per format in *output_dir*).  A
+    packed sink buffers ``sink.batch_size`` videos per flush, and those
+    videos reach the journal (and ``on_saved``) only once the flush has made
+    them durable.
+    """
+    own_sink = sink is None
+    sink = sink or DirectorySink(output_dir)
+    pipeline = TranscriptPipeline(language, export_formats, segment_mode, workers, render_processes, archive, index,
+                                  tracks)
+    skip = None
+    skipped = 0
+    if resume and journal is not None:
+        done = journal.completed_ids()
+
+        def skip(entry: dict) -> bool:
+            nonlocal skipped
+            if entry["id"] in done:
+                skipped += 1
+                return True
+            return False
+
+    results = []
+    unflushed = []
+
+    def flush():
+        sink.flush()
+        for pending in unflushed:
+            if journal is not None:
+                journal.record(pending)
+            if on_saved is not None:
+                on_saved(pending)
+        unflushed.clear()
+
+    for result, video_info, rendered in pipeline.run(video_ids, limit, skip):
+        if rendered is not None:
+            _write_rendered(result, video_info, rendered, sink)
+        print(result["message"])
+        unflushed.append(result)
+        if len(unflushed) >= sink.batch_size:
+            flush()
+        results.append(result)
+    flush()
+    if own_sink:
+        sink.close()
+
+    failed = sum(1 for r in results if r["status"] != "ok")
+    summary = f"\n📊 Processed {len(results)} videos: {len(results) - failed} saved, {failed} failed."
+    if skipped:
+        summary += f" Skipped {skipped} already completed."
+    print(summary)
+    return results
+
+
+def sync_sources(sources: List[str], language: str, export_formats: List[str], output_dir: str,
+                 state: SyncState, recheck_days: Optional[float] = None, limit: Optional[int] = None,
+                 **batch_options) -> List[dict]:
+    """Processes what is new in each playlist or channel URL since its last
+    sync, plus the rechecks that are due (see ``sync_state``).  Other keyword
+    arguments go to ``process_batch``."""
+    results = []
+    for url in sources:
+        known = state.known(url)
+        last = state.last_sync(url)
+        retries = state.retry_due(url)
+        rechecks = state.recheck_due(url, recheck_days) if recheck_days is not None else []
+        since = time.strftime("%Y-%m-%d %H:%M", time.localtime(last)) if last else "never"
+        print(f"\n🔄 Syncing {url}: {len(known)} videos known, last synced {since}"
+              + (f", {len(retries)} to retry" if retries else "")
+              + (f", {len(rechecks)} to recheck" if rechecks else ""))
+        finished_tabs = set()
+        entries = itertools.chain(
+            ({"id": video_id} for video_id in retries),
+            # a recheck must ask YouTube again, not the transcript or track cache
+            ({"id": video_id, "refresh": True} for video_id in rechecks),
+            state.new_entries(url, iter_playlist_entries(url, limit, finished_tabs), known.keys() | retries,
+                              finished_tabs),
+        )
+        results.extend(process_batch(entries, language, export_formats, output_dir,
+                                     on_saved=lambda result, url=url: state.record(url, result), **batch_options))
+        state.mark_synced(url)
+    return results
+
+
+def rerender_archive(export_formats: List[str], output_dir: str, segment_mode: str = "auto",
+                     workers: Optional[int] = None, chunk_size: int = 64,
+                     sink: Optional[OutputSink] = None) -> List[dict]:
+    """Regenerates every output format from the output directory's transcript
+    archive, without network access.  Chunks of videos are read and rendered
+    on ``workers`` processes (default: one per CPU core) and written to *sink*
+    (default: files in *output_dir*) as each chunk comes back, in archive
+    order."""
+    archive = TranscriptArchive(output_dir)
+    video_ids = archive.video_ids()
+    archive.close()
+    if not video_ids:
+        print(f"❌ No archived transcripts found in {output_dir}.")
+        return []
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    own_sink = sink is None
+    sink = sink or DirectorySink(output_dir)
+    chunks = [video_ids[i:i + chunk_size] for i in range(0, len(video_ids), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        rendered_chunks = pool.map(
+            render_archived_chunk,
+            itertools.repeat(archive.path), chunks,
+            itertools.repeat(export_formats), itertools.repeat(segment_mode),
+        )
+        for chunk in rendered_chunks:
+            for video_id, video_info, rendered in chunk:
+                result = new_result(video_id)
+                _write_rendered(result, video_info, rendered, sink)
+                print(result["message"])
+                results.append(result)
+    if own_sink:
+        sink.close()
+    else:
+        sink.flush()
 
-def process_batch(video_ids: List[str], language: str, export_format: str, output_dir: str):
-    """Processes a batch of video IDs."""
-    for video_id in video_ids:
-        if "playlist" not in video_id.lower():
-            download_single_transcript(video_id, language, export_format, output_dir)
-        else: #Handles playlist links passed from a file
-            ids_from_playlist = get_playlist_video_ids(video_id)
-            if ids_from_playlist:
-                for extracted_id in ids_from_playlist:
-                    download_single_transcript(extracted_id, language, export_format, output_dir)
+    failed = sum(1 for r in results if r["status"] != "ok")
+    print(f"\n📊 Re-rendered {len(results)} videos: {len(results) - failed} saved, {failed} failed.")
+    return results
 
 
+def _parse_tracks(value: str) -> List[str]:
+    """argparse type for ``--tracks manual,generated``."""
+    steps = [step.strip().lower() for step in value.split(",") if step.strip()]
+    unknown = [step for step in steps if step not in TRACK_STEPS]
+    if unknown or not steps:
+        raise argparse.ArgumentTypeError(f"unknown track kind {', '.join(unknown)!r} (choose from {', '.join(TRACK_STEPS)})")
+    return steps
+
+
+def _parse_formats(value: str) -> List[str]:
+    """argparse type for ``--format md,json,srt``."""
+    formats = []
+    for fmt in value.split(","):
+        fmt = fmt.strip().lower()
+        if fmt not in FORMATS:
+            raise argparse.ArgumentTypeError(f"unknown format {fmt!r} (choose from {', '.join(FORMATS)})")
+        if fmt not in formats:
+            formats.append(fmt)
+    return formats
+
+
+def _write_report(args: argparse.Namespace, output_dir: str):
+    """Saves the stage timings and counters collected during this run."""
+    report = run_metrics.report()
+    run_metrics.write_json(args.report or os.path.join(output_dir, REPORT_NAME), report)
+    if args.prometheus:
+        run_metrics.write_prometheus(args.prometheus, report)
+
+
+def search(argv: Optional[List[str]] = None):
+    """The ``search`` subcommand: ranked hits with links to the moment they are spoken."""
+    parser = argparse.ArgumentParser(prog="batch_processing_yt.py search",
+                                     description="Search the transcripts downloaded into an output directory.")
+    parser.add_argument("query", help='Words to look for; "exact phrases", OR, NOT and prefix* also work')
+    parser.add_argument("-o", "--output", help="Output directory the transcripts were downloaded into (default: current directory)")
+    parser.add_argument("-n", "--limit", type=int, default=20, help="Maximum number of hits (default: 20)")
+    args = parser.parse_args(argv)
+
+    output_dir = args.output if args.output else "."
+    if not os.path.isdir(output_dir):
+        print("❌ Invalid output directory.")
+        return
+    index = SearchIndex(output_dir)
+    if os.path.exists(os.path.join(output_dir, ARCHIVE_NAME)):
+        archive = TranscriptArchive(output_dir, readonly=True)
+        added = index.catch_up(archive)
+        archive.close()
+        if added:
+            print(f"🗂️ Indexed {added} transcripts that were not searchable yet.")
+    hits = index.search(args.query, args.limit)
+    index.close()
+
+    if not hits:
+        print(f"🔎 No matches for {args.query!r}.")
+        return
+    print(f"🔎 {len(hits)} matches for {args.query!r}:\n")
+    for i, hit in enumerate(hits, 1):
+        minutes, seconds = divmod(int(hit["start"]), 60)
+        hours, minutes = divmod(minutes, 60)
+        at = f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+        print(f"{i}. {hit['title']} [{hit['video_id']}] at {at}")
+        print(f"   {hit['url']}")
+        print(f"   {hit['snippet']}\n")
+
 
 def main():
-    parser = argparse.ArgumentParser(description="Download YouTube video transcripts.")
-    parser.add_argument("input", help="YouTube video URL/ID, playlist URL, or path to a file containing URLs/IDs")
-    parser.add_argument("-l", "--language", default="en", help="Transcript language code (default: en)")
-    parser.add_argument("-f", "--format", default="txt", choices=["txt", "md", "json"], help="Output format (txt, md, json)")
+    if sys.argv[1:2] == ["search"]:
+        search(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(description="Download YouTube video transcripts.",
+                                     epilog='Run "%(prog)s search QUERY" to search the downloaded transcripts.')
+    parser.add_argument("input", nargs="?", help="YouTube video URL/ID, playlist or channel URL, or path to a file containing them")
+    parser.add_argument("-l", "--language", default="en",
+                        help="Transcript language code, or a comma-separated priority list such as en,en-GB (default: en)")
+    parser.add_argument("--tracks", default=",".join(TRACK_STEPS), type=_parse_tracks,
+                        help=f"Caption tracks to accept, in order of preference (default: {','.join(TRACK_STEPS)})")
+    parser.add_argument("-f", "--format", default="txt", type=_parse_formats,
+                        help=f"Comma-separated output formats, all rendered from one fetch ({', '.join(FORMATS)}; default: txt)")
     parser.add_argument("-o", "--output", help="Output directory (default: current directory)")
+    parser.add_argument("-s", "--segment", default="auto", choices=SEGMENT_MODES,
+                        help="Paragraph segmentation: sentences, pauses (speech gaps, for unpunctuated auto captions) or auto (default)")
+    parser.add_argument("-w", "--workers", type=int,
+                        help="Number of videos to process concurrently (default: 1; CPU count with --rerender)")
+    parser.add_argument("--render-processes", type=int, default=0,
+                        help="Render outputs on this many processes instead of the download threads (default: 0)")
+    parser.add_argument("--sink", default="dir", choices=list(SINK_FILES),
+                        help="Where outputs go: dir (one file per video and format, default), or one packed file in the "
+                             "output directory: jsonl, jsonl.gz, jsonl.zst, sqlite, tar or zip")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk transcript cache")
+    parser.add_argument("--refresh", action="store_true", help="Re-download transcripts and overwrite cached copies")
+    parser.add_argument("--limit", type=int, help="Maximum number of videos to take from each playlist/channel (default: all)")
+    parser.add_argument("--rerender", action="store_true",
+                        help="Regenerate outputs from the output directory's transcript archive without network access")
+    parser.add_argument("--sync", action="store_true",
+                        help="Process only videos added to the playlist/channel (or the file's playlists/channels) since the last --sync")
+    parser.add_argument("--recheck-days", type=float, metavar="DAYS",
+                        help="With --sync, also retry videos that had no captions or only auto-generated ones more than DAYS days ago")
+    parser.add_argument("--resume", action="store_true", help="Skip videos the output directory's job journal marks as done")
+    parser.add_argument("--report", help=f"Where to write the JSON run report (default: {REPORT_NAME} in the output directory)")
+    parser.add_argument("--prometheus", help="Also write the run report in Prometheus text format to this file")
+    parser.add_argument("--profile", nargs="?", const=profiling.DEFAULT_PREFIX, metavar="PREFIX",
+                        help=f"Profile the run with cProfile; writes PREFIX.prof and PREFIX.txt (default prefix: {profiling.DEFAULT_PREFIX})")
+    parser.add_argument("--profile-memory", type=int, default=0, metavar="N",
+                        help="Also track allocations with tracemalloc and write the top N sites to PREFIX.mem.txt")
     args = parser.parse_args()
 
+    with profiling.profiled(args.profile, args.profile_memory):
+        _run(parser, args)
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace):
+
+    # without --no-cache, leave the YT2MD_NO_CACHE setting alone
+    transcript_cache.configure(enabled=False if args.no_cache else None, refresh=args.refresh)
+
+    if args.workers is not None and args.workers < 1:
+        print("❌ --workers must be at least 1.")
+        return
+    if args.render_processes < 0:
+        print("❌ --render-processes cannot be negative.")
+        return
+    if args.sync and args.rerender:
+        parser.error("--sync and --rerender cannot be combined")
+    if args.input is None and not args.rerender:
+        parser.error("the input argument is required unless --rerender is given")
+
     output_dir = args.output if args.output else "."
     if not os.path.isdir(output_dir):
         print("❌ Invalid output directory.")
         return
 
-    available_formats = {
-     "txt": "Plain Text",
-     "md": "Markdown",
-     "json": "JSON",
-    }
-    export_format = available_formats.get(args.format)
+    export_formats = args.format
+    try:
+        sink = open_sink(args.sink, output_dir)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return
+    if args.rerender:
+        rerender_archive(export_formats, output_dir, args.segment, args.workers, sink=sink)
+        sink.close()
+        _write_report(args, output_dir)
+        return
 
-    if os.path.isfile(args.input):
+    journal = JobJournal(output_dir)
+    archive = TranscriptArchive(output_dir)
+    index = SearchIndex(output_dir)
+    batch_options = {"workers": args.workers or 1, "journal": journal, "resume": args.resume, "limit": args.limit,
+                     "segment_mode": args.segment, "archive": archive, "render_processes": args.render_processes,
+                     "sink": sink, "index": index, "tracks": args.tracks}
+
+    if args.sync:
+        if os.path.isfile(args.input):
+            with open(args.input, "r", encoding="utf-8") as file:
+                sources = [line.strip() for line in file if line.strip()]
+        else:
+            sources = [args.input]
+        invalid = [source for source in sources if not is_collection_url(source)]
+        if invalid:
+            print(f"❌ --sync needs playlist or channel URLs: {', '.join(invalid)}")
+        else:
+            state = SyncState(output_dir)
+            batch_options["resume"] = False  # the sync state decides what to skip
+            sync_sources(sources, args.language, export_formats, output_dir, state, args.recheck_days, **batch_options)
+            state.close()
+    elif os.path.isfile(args.input):
         try:
             with open(args.input, "r", encoding="utf-8") as file:
                 video_ids = [line.strip() for line in file if line.strip()]  #handles files and playlists
@@ -179,25 +411,32 @@ def main():
                     extracted_id = extract_video_id(vid_or_url)
                     if extracted_id:
                         cleaned_ids.append(extracted_id)
-                    elif "playlist" in vid_or_url.lower():
-                         playlist_ids = get_playlist_video_ids(vid_or_url)
-                         if playlist_ids:
-                            cleaned_ids.extend(playlist_ids)
+                    elif is_collection_url(vid_or_url):
+                        cleaned_ids.append(vid_or_url)  # expanded lazily by process_batch
+                    else:
+                        print(f"⚠️ Skipping {vid_or_url!r}: not a video, playlist or channel link.")
 
-                process_batch(cleaned_ids, args.language, export_format, output_dir)
+                process_batch(cleaned_ids, args.language, export_formats, output_dir, **batch_options)
 
         except Exception as e:
             print(f"Error processing file: {e}")
 
-    elif "playlist" in args.input.lower():
-        video_ids = get_playlist_video_ids(args.input)
-        if video_ids:
-            process_batch(video_ids, args.language, export_format, output_dir)
+    elif is_collection_url(args.input):
+        process_batch([args.input], args.language, export_formats, output_dir, **batch_options)
     else:
         video_id = extract_video_id(args.input)
-        if video_id:
-            download_single_transcript(video_id, args.language, export_format, output_dir)
-
+        if video_id is None:
+            print("❌ Invalid input: expected a YouTube video URL/ID, a playlist or channel URL, or a file of them.")
+        elif args.resume and video_id in journal.completed_ids():
+            print(f"⏭️ {video_id} is already done according to the job journal.")
+        else:
+            journal.record(download_single_transcript(video_id, args.language, export_formats, output_dir,
+                                                      args.segment, archive, sink, index, args.tracks))
+    sink.close()
+    journal.close()
+    archive.close()
+    index.close()
+    _write_report(args, output_dir)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Benchmark: legacy join/split process_transcript vs the streaming builder.
+
+Builds a synthetic transcript shaped like a long livestream (short caption
+snippets, occasional ``[mm:ss]`` markers) and reports wall time and peak
+traced memory for:
+
+  legacy   – the original implementation (one big joined string)
+  list     – transcript_text.process_transcript (returns all paragraphs)
+  stream   – transcript_text.iter_paragraphs consumed one at a time, the way
+             a writer would
+
+Run from the repository root:
+
+    python benchmarks/bench_process_transcript.py [--snippets 100000]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcript_text import iter_paragraphs, process_transcript  # noqa: E402
+
+WORDS = "the a we so and then this video about going to you know really like just".split()
+
+
+def legacy_process_transcript(transcript):
+    full_text = ' '.join([fragment['text'] for fragment in transcript])
+    full_text = re.sub(r'\[?[0-9]+:[0-9]+\]?', '', full_text)
+    sentences = re.split(r'(?<=[.!?]) +', full_text)
+
+    paragraphs = []
+    current_paragraph = []
+    for sentence in sentences:
+        current_paragraph.append(sentence)
+        if len(current_paragraph) >= 3:
+            paragraphs.append(' '.join(current_paragraph))
+            current_paragraph = []
+    if current_paragraph:
+        paragraphs.append(' '.join(current_paragraph))
+    return paragraphs
+
+
+def make_transcript(n, seed=0):
+    rng = random.Random(seed)
+    snippets = []
+    for i in range(n):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(4, 10))]
+        text = " ".join(words)
+        if rng.random() < 0.3:
+            text += rng.choice(".!?")
+        if rng.random() < 0.01:
+            text = f"[{i // 60}:{i % 60:02d}] " + text
+        snippets.append({"text": text, "start": i * 3.0, "duration": 3.0})
+    return snippets
+
+
+def measure(fn, transcript):
+    """Times *fn* untraced, then runs it again under tracemalloc for the peak."""
+    t0 = time.perf_counter()
+    result = fn(transcript)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fn(transcript)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def stream(transcript):
+    count = 0
+    for _ in iter_paragraphs(transcript):
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--snippets", type=int, default=100_000, help="Snippets in the synthetic transcript")
+    args = parser.parse_args()
+
+    transcript = make_transcript(args.snippets)
+    expected, t_legacy, m_legacy = measure(legacy_process_transcript, transcript)
+    got, t_list, m_list = measure(process_transcript, transcript)
+    count, t_stream, m_stream = measure(stream, transcript)
+
+    assert got == expected, "streaming builder output differs from legacy"
+    assert count == len(expected)
+
+    print(f"{args.snippets} snippets -> {len(expected)} paragraphs")
+    print(f"{'variant':<8} {'time (s)':>9} {'peak (KiB)':>11}")
+    for name, t, m in (("legacy", t_legacy, m_legacy), ("list", t_list, m_list), ("stream", t_stream, m_stream)):
+        print(f"{name:<8} {t:>9.3f} {m / 1024:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
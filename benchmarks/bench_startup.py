@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Start-up budget check for the command line tools.
+
+Imports each module in a fresh interpreter under ``python -X importtime``,
+reports the total import time and the slowest imports, and fails when
+
+  * a heavy optional dependency (yt_dlp, numpy, requests,
+    youtube_transcript_api, multiprocessing) is loaded at import time, or
+  * the median total over ``--runs`` runs exceeds ``--budget-ms``.
+
+Run from the repository root (exit status 1 on a violation, so it can gate
+CI or a pre-commit hook):
+
+    python benchmarks/bench_startup.py [--budget-ms 50] [--runs 5]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["batch_processing_yt", "youtube_cli"]
+HEAVY = ["yt_dlp", "numpy", "requests", "youtube_transcript_api", "multiprocessing"]
+LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(module: str):
+    """Returns ({imported module: cumulative µs}, total µs) for *module*.
+
+    Only imports triggered by *module* itself are included, not the ones the
+    interpreter does at start-up (``site``, ``.pth`` hooks).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    children = {}
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if not match:
+            continue
+        name, total = match.group(4), int(match.group(2))
+        if len(match.group(3)) > 1:  # nested: belongs to the next top-level import
+            children[name] = total
+        elif name == module:
+            return children, total
+        else:
+            children = {}
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="Maximum median import time per module")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        runs = [measure(module) for _ in range(args.runs)]
+        median_ms = statistics.median(total for _, total in runs) / 1000
+        cumulative = runs[-1][0]
+        heavy = [name for name in HEAVY if name in cumulative]
+        status = "ok"
+        if heavy or median_ms > args.budget_ms:
+            status = "FAIL"
+            failed = True
+        print(f"{module:<22} {median_ms:7.1f} ms  (budget {args.budget_ms:.0f} ms)  {status}")
+        if heavy:
+            print(f"  heavy imports at start-up: {', '.join(heavy)}")
+        slowest = sorted((t, name) for name, t in cumulative.items() if name != module)[-args.top:]
+        for t, name in reversed(slowest):
+            print(f"  {t / 1000:7.1f} ms  {name}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
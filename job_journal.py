@@ -0,0 +1,66 @@
+"""Append-only job journal for resumable batch runs.
+
+Each processed video appends one JSON line recording its status, output
+paths and error class to ``.yt2md-journal.jsonl`` in the output directory.
+A later run with ``--resume`` reads the journal back, skips every video whose
+latest record is "ok" and retries the rest.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Set
+
+JOURNAL_NAME = ".yt2md-journal.jsonl"
+
+
+class JobJournal:
+    """Line-buffered JSONL journal; one record per processed video."""
+
+    def __init__(self, output_dir: str, path: Optional[str] = None):
+        self.path = path or os.path.join(output_dir, JOURNAL_NAME)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def record(self, result: dict):
+        """Appends the outcome of one video (a ``process_batch`` result dict)."""
+        line = json.dumps({
+            "video_id": result["video_id"],
+            "status": result["status"],
+            "paths": result.get("paths", []),
+            "error": result.get("error"),
+            "time": time.time(),
+        }, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._file.write(line + "\n")
+
+    def load(self) -> Dict[str, dict]:
+        """Returns the latest record per video ID.
+
+        A line torn by a crash mid-write is ignored; that video is simply
+        retried on resume.
+        """
+        latest = {}
+        if not os.path.exists(self.path):
+            return latest
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                latest[entry["video_id"]] = entry
+        return latest
+
+    def completed_ids(self) -> Set[str]:
+        """IDs whose most recent attempt succeeded."""
+        return {vid for vid, entry in self.load().items() if entry["status"] == "ok"}
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,420 @@
+"""Where the batch pipeline writes rendered transcripts.
+
+``dir`` (the default) keeps the original layout, one file per video and
+format in the output directory, through ``output_store.OutputStore``
+(collision-free names, unchanged files left alone).  At corpus scale that means hundreds of
+thousands of small files, so the packed sinks write everything into a single
+file in the output directory instead:
+
+* ``jsonl`` / ``jsonl.gz`` / ``jsonl.zst``: ``transcripts.jsonl[.gz|.zst]``,
+  one JSON object per video with every rendered format, appended through a
+  large write buffer (``.zst`` needs the optional ``zstandard`` package);
+* ``sqlite``: ``transcripts.sqlite3``, one row per video and format, written
+  with ``executemany`` and committed in batches;
+* ``tar`` / ``zip``: ``transcripts.tar`` / ``transcripts.zip``, the same
+  files as ``dir`` but as archive members.
+
+Packed sinks buffer up to ``batch_size`` videos before ``flush()`` makes them
+durable; ``process_batch`` journals videos only after that flush.  The JSONL,
+tar and zip sinks also record the file size after each flush in a
+``.committed`` file next to it and cut anything beyond it off when they are
+opened again (a zip, whose central directory is only written on close, gets
+a new one rebuilt from its entries), so a crash mid-batch costs only that
+batch: the file stays readable and ``--resume`` redoes exactly the videos
+that were not journaled.
+Every sink is appended to, so ``--resume`` runs add to the same file.
+"""
+
+import gzip
+import io
+import json
+import os
+import sqlite3
+import struct
+import tarfile
+import time
+import zipfile
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import run_metrics
+from output_store import OutputStore
+from transcript_pipeline import sanitize_filename
+from video_metadata import UNKNOWN_INFO
+
+SINK_FILES = {
+    "dir": None,
+    "jsonl": "transcripts.jsonl",
+    "jsonl.gz": "transcripts.jsonl.gz",
+    "jsonl.zst": "transcripts.jsonl.zst",
+    "sqlite": "transcripts.sqlite3",
+    "tar": "transcripts.tar",
+    "zip": "transcripts.zip",
+}
+DEFAULT_BATCH_SIZE = 256
+
+
+def save_transcript(formatted_transcript: str, filename: str, extension: str, output_directory: str) -> str:
+    """Saves the transcript to a file and returns its path."""
+    file_path = os.path.join(output_directory, f"{filename}.{extension}")
+    with run_metrics.timed("write"), open(file_path, 'w', encoding='utf-8') as f:
+        f.write(formatted_transcript)
+        run_metrics.count("bytes_written", f.tell())
+    return file_path
+
+
+class OutputSink:
+    """Base class: ``write`` one video's outputs, ``flush`` to make buffered
+    writes durable, ``close`` at the end of the run."""
+
+    kind = "dir"
+    batch_size = 1
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.location = output_dir
+        self._names: Dict[str, Optional[str]] = {}  # file name -> video ID (None: from an earlier run)
+
+    def name_for(self, video_id: str, video_info: dict) -> str:
+        """The file name (without extension) for *video_id*'s outputs.
+
+        Follows ``OutputStore``'s rules: the sanitized title, the video ID
+        while the title is unknown (or sanitizes to nothing), and
+        ``<title>_<video ID>`` when another video already has the name.
+        """
+        title = video_info["title"]
+        name = (sanitize_filename(title) if title != UNKNOWN_INFO["title"] else "") or video_id
+        if self._names.setdefault(name, video_id) != video_id:
+            name = f"{name}_{video_id}"
+            self._names[name] = video_id
+        return name
+
+    def _reserve(self, names: Iterable[str]):
+        """Marks file names written by earlier runs as taken."""
+        for name in names:
+            self._names.setdefault(name, None)
+
+    def write(self, video_id: str, filename: str, video_info: dict, outputs: Sequence[Tuple[str, str]]) -> List[str]:
+        """Stores ``[(extension, content), ...]`` and returns where each went."""
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class DirectorySink(OutputSink):
+    """One ``<filename>.<extension>`` file per output (the default)."""
+
+    def __init__(self, output_dir: str):
+        super().__init__(output_dir)
+        self.store = OutputStore(output_dir)
+
+    def name_for(self, video_id, video_info):
+        return self.store.name_for(video_id, video_info["title"])
+
+    def write(self, video_id, filename, video_info, outputs):
+        return [self.store.put(video_id, filename, extension, content)[0] for extension, content in outputs]
+
+    def flush(self):
+        self.store.commit()
+
+    def close(self):
+        self.store.close()
+
+
+class JsonlSink(OutputSink):
+    """Appends one JSON line per video, optionally gzip- or zstd-compressed.
+
+    Each flush appends the buffered batch as one complete gzip member / zstd
+    frame, which standard readers decode as one continuous stream.  File
+    names are unique within a run; records of runs appended later are told
+    apart by their ``video_id``.
+    """
+
+    def __init__(self, output_dir: str, kind: str = "jsonl", batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(output_dir)
+        self.kind = kind
+        self.batch_size = batch_size
+        self.location = os.path.join(output_dir, SINK_FILES[kind])
+        self._compress = None
+        if kind == "jsonl.gz":
+            self._compress = gzip.compress
+        elif kind == "jsonl.zst":
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError("the jsonl.zst sink needs the zstandard package (pip install zstandard)")
+            self._compress = zstandard.ZstdCompressor().compress
+        _restore_committed(self.location)
+        self._raw = open(self.location, "ab")
+        self._lines = []
+
+    def write(self, video_id, filename, video_info, outputs):
+        line = json.dumps({
+            "video_id": video_id,
+            "filename": filename,
+            "title": video_info.get("title"),
+            "author": video_info.get("author_name"),
+            "outputs": dict(outputs),
+        }, ensure_ascii=False).encode("utf-8") + b"\n"
+        self._lines.append(line)
+        run_metrics.count("bytes_written", len(line))
+        return [f"{self.location}#{video_id}.{extension}" for extension, _ in outputs]
+
+    def flush(self):
+        if not self._lines:
+            return
+        data = b"".join(self._lines)
+        self._lines = []
+        with run_metrics.timed("flush"):
+            if self._compress is not None:
+                data = self._compress(data)
+            self._raw.write(data)
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
+            _mark_committed(self.location, self._raw.tell())
+
+    def close(self):
+        self.flush()
+        self._raw.close()
+
+
+def _committed_path(path: str) -> str:
+    return path + ".committed"
+
+
+def _mark_committed(path: str, size: int):
+    """Records that the first *size* bytes of *path* are complete and synced."""
+    marker = _committed_path(path)
+    with open(marker + ".tmp", "wb") as f:
+        f.write(b"%d\n" % size)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(marker + ".tmp", marker)
+
+
+def _committed_size(path: str) -> Optional[int]:
+    try:
+        with open(_committed_path(path), "rb") as f:
+            return int(f.readline())
+    except (OSError, ValueError):
+        return None
+
+
+def _restore_committed(path: str):
+    """Puts *path* back to its last committed state, dropping whatever a
+    crashed run wrote after its last flush (a torn gzip member, half a tar
+    member)."""
+    size = _committed_size(path)
+    if size is None or not os.path.exists(path) or os.path.getsize(path) == size:
+        return
+    with open(path, "r+b") as f:
+        f.truncate(size)
+
+
+class SqliteSink(OutputSink):
+    """One row per video and format in a single SQLite database."""
+
+    kind = "sqlite"
+
+    def __init__(self, output_dir: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(output_dir)
+        self.batch_size = batch_size
+        self.location = os.path.join(output_dir, SINK_FILES["sqlite"])
+        self._conn = sqlite3.connect(self.location, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS outputs (
+                   video_id TEXT NOT NULL,
+                   extension TEXT NOT NULL,
+                   filename TEXT NOT NULL,
+                   title TEXT,
+                   author TEXT,
+                   content TEXT NOT NULL,
+                   written_at REAL NOT NULL,
+                   PRIMARY KEY (video_id, extension)
+               )"""
+        )
+        self._conn.commit()
+        for filename, video_id in self._conn.execute("SELECT DISTINCT filename, video_id FROM outputs"):
+            self._names.setdefault(filename, video_id)
+        self._rows = []
+
+    def write(self, video_id, filename, video_info, outputs):
+        now = time.time()
+        for extension, content in outputs:
+            self._rows.append((video_id, extension, filename, video_info.get("title"),
+                               video_info.get("author_name"), content, now))
+            run_metrics.count("bytes_written", len(content))
+        return [f"{self.location}#{video_id}.{extension}" for extension, _ in outputs]
+
+    def flush(self):
+        if not self._rows:
+            return
+        with run_metrics.timed("flush"):
+            self._conn.executemany("INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?, ?)", self._rows)
+            self._conn.commit()
+        for filename, video_id in self._conn.execute("SELECT DISTINCT filename, video_id FROM outputs"):
+            self._names.setdefault(filename, video_id)
+        self._rows = []
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+
+class ArchiveSink(OutputSink):
+    """The directory layout, as members of one tar or zip archive."""
+
+    def __init__(self, output_dir: str, kind: str = "tar", batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(output_dir)
+        self.kind = kind
+        self.batch_size = batch_size
+        self.location = os.path.join(output_dir, SINK_FILES[kind])
+        if kind == "zip":
+            _restore_zip(self.location)
+        else:
+            _restore_committed(self.location)
+        self._open()
+        members = self._archive.namelist() if kind == "zip" else self._archive.getnames()
+        self._reserve(member.rsplit(".", 1)[0] for member in members)
+
+    def _open(self):
+        if self.kind == "zip":
+            self._archive = zipfile.ZipFile(self.location, "a", zipfile.ZIP_DEFLATED)
+        else:
+            _terminate_tar(self.location)
+            self._archive = tarfile.open(self.location, "a")
+
+    def write(self, video_id, filename, video_info, outputs):
+        locations = []
+        now = time.time()
+        with run_metrics.timed("write"):
+            for extension, content in outputs:
+                name = f"{filename}.{extension}"
+                data = content.encode("utf-8")
+                if self.kind == "zip":
+                    self._archive.writestr(name, data)
+                else:
+                    member = tarfile.TarInfo(name)
+                    member.size = len(data)
+                    member.mtime = now
+                    self._archive.addfile(member, io.BytesIO(data))
+                run_metrics.count("bytes_written", len(data))
+                locations.append(f"{self.location}#{name}")
+        return locations
+
+    def flush(self):
+        with run_metrics.timed("flush"):
+            if self.kind == "zip":
+                # up to the last entry; the central directory is only written
+                # on close and rebuilt from the entries after a crash
+                self._archive.fp.flush()
+                os.fsync(self._archive.fp.fileno())
+                _mark_committed(self.location, self._archive.start_dir)
+            else:
+                # up to the last member; the end-of-archive blocks come on close
+                self._archive.fileobj.flush()
+                os.fsync(self._archive.fileobj.fileno())
+                _mark_committed(self.location, self._archive.offset)
+
+    def close(self):
+        entries_end = self._archive.start_dir if self.kind == "zip" else None
+        self._archive.close()
+        with open(self.location, "rb") as f:
+            os.fsync(f.fileno())
+        _mark_committed(self.location, entries_end if entries_end is not None else os.path.getsize(self.location))
+
+
+def _restore_zip(path: str):
+    """Rebuilds the central directory of a zip a crashed run left without one.
+
+    The zip's committed size is where its entries end.  When the central
+    directory found there is intact the zip is fine; otherwise the file is
+    cut back to that size and a new directory is written from the local
+    entry headers.
+    """
+    size = _committed_size(path)
+    if size is None or not os.path.exists(path):
+        return
+    try:
+        with zipfile.ZipFile(path) as archive:
+            if archive.start_dir == size:
+                return
+    except zipfile.BadZipFile:
+        pass
+    with open(path, "r+b") as f:
+        f.truncate(size)
+    entries = _scan_zip_entries(path)
+    with open(path, "r+b") as f:
+        f.truncate(entries[-1][1] if entries else 0)
+    # no central directory at the end: ZipFile starts a new one there
+    archive = zipfile.ZipFile(path, "a")
+    for info, _ in entries:
+        archive.filelist.append(info)
+        archive.NameToInfo[info.filename] = info
+    archive.close()
+
+
+def _scan_zip_entries(path: str) -> List[Tuple[zipfile.ZipInfo, int]]:
+    """``(ZipInfo, end offset)`` of each complete entry, read from the local
+    headers, up to the first one that is cut off or not understood."""
+    entries = []
+    end = os.path.getsize(path)
+    offset = 0
+    with open(path, "rb") as f:
+        while offset + zipfile.sizeFileHeader <= end:
+            f.seek(offset)
+            (signature, extract_version, _, flag_bits, compress_type, dos_time, dos_date, crc,
+             compress_size, file_size, name_length, extra_length) = struct.unpack(
+                zipfile.structFileHeader, f.read(zipfile.sizeFileHeader))
+            # sizes after the data (bit 3) or in a zip64 field are not written by this sink
+            if signature != zipfile.stringFileHeader or flag_bits & 0x08 or compress_size == 0xFFFFFFFF:
+                break
+            name = f.read(name_length).decode("utf-8" if flag_bits & 0x800 else "cp437")
+            extra = f.read(extra_length)
+            entry_end = offset + zipfile.sizeFileHeader + name_length + extra_length + compress_size
+            if entry_end > end:
+                break
+            info = zipfile.ZipInfo(name, ((dos_date >> 9) + 1980, (dos_date >> 5) & 0xF, dos_date & 0x1F,
+                                          dos_time >> 11, (dos_time >> 5) & 0x3F, (dos_time & 0x1F) * 2))
+            info.extract_version = extract_version
+            info.flag_bits = flag_bits
+            info.compress_type = compress_type
+            info.CRC = crc
+            info.compress_size = compress_size
+            info.file_size = file_size
+            info.extra = extra
+            info.external_attr = 0o600 << 16  # as ZipFile.writestr sets it
+            info.header_offset = offset
+            entries.append((info, entry_end))
+            offset = entry_end
+    return entries
+
+
+def _terminate_tar(path: str):
+    """Adds the end-of-archive blocks a tar cut back to its last flushed
+    member lacks, so ``tarfile`` can append to it again."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, "r+b") as f:
+        f.seek(-min(2 * tarfile.BLOCKSIZE, os.path.getsize(path)), os.SEEK_END)
+        if f.read().count(tarfile.NUL) != 2 * tarfile.BLOCKSIZE:
+            f.seek(0, os.SEEK_END)
+            f.write(tarfile.NUL * (2 * tarfile.BLOCKSIZE))
+
+
+def open_sink(kind: str, output_dir: str) -> OutputSink:
+    """Opens the sink named *kind* (a key of ``SINK_FILES``) in *output_dir*."""
+    if kind == "dir":
+        return DirectorySink(output_dir)
+    if kind.startswith("jsonl"):
+        return JsonlSink(output_dir, kind)
+    if kind == "sqlite":
+        return SqliteSink(output_dir)
+    if kind in ("tar", "zip"):
+        return ArchiveSink(output_dir, kind)
+    raise ValueError(f"unknown output sink {kind!r}")
@@ -0,0 +1,121 @@
+"""Change-detecting file store behind the default ``dir`` output sink.
+
+Outputs are keyed by video ID and extension, not by title, and the SHA-256
+of each written file is kept in ``.yt2md-outputs.sqlite3`` in the output
+directory, so
+
+* a file whose rendered bytes have not changed is not rewritten (a repeat
+  sync costs one index lookup and one ``stat`` per output);
+* files are written to a temporary name and renamed into place, so a crash
+  never leaves a half-written transcript behind;
+* every video gets its own file name, kept in a name index: the sanitized
+  title, with ``_<video ID>`` appended when another video already uses it,
+  or the bare video ID while the title is unknown (noembed failed).  A name
+  stays fixed once given, except that an ID-only name is replaced (and its
+  files renamed) as soon as the real title is known.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+import run_metrics
+from transcript_pipeline import sanitize_filename
+from video_metadata import UNKNOWN_INFO
+
+STORE_NAME = ".yt2md-outputs.sqlite3"
+
+
+class OutputStore:
+    """Files in *output_dir* plus the index of their names and digests."""
+
+    def __init__(self, output_dir: str, path: Optional[str] = None):
+        self.output_dir = output_dir
+        self.path = path or os.path.join(output_dir, STORE_NAME)
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS names (
+                   video_id TEXT PRIMARY KEY,
+                   filename TEXT NOT NULL UNIQUE
+               );
+               CREATE TABLE IF NOT EXISTS outputs (
+                   video_id TEXT NOT NULL,
+                   extension TEXT NOT NULL,
+                   digest TEXT NOT NULL,
+                   size INTEGER NOT NULL,
+                   written_at REAL NOT NULL,
+                   PRIMARY KEY (video_id, extension)
+               );"""
+        )
+        self._conn.commit()
+
+    def name_for(self, video_id: str, title: str) -> str:
+        """Returns the file name (without extension) of *video_id*."""
+        row = self._conn.execute("SELECT filename FROM names WHERE video_id = ?", (video_id,)).fetchone()
+        known = title and title != UNKNOWN_INFO["title"]
+        if row is not None and not (row[0] == video_id and known):
+            return row[0]
+        name = video_id
+        if known:
+            base = sanitize_filename(title) or video_id
+            taken = self._conn.execute("SELECT 1 FROM names WHERE filename = ?", (base,)).fetchone()
+            name = f"{base}_{video_id}" if taken else base
+        if row is not None:
+            self._rename(video_id, row[0], name)
+        self._conn.execute("INSERT OR REPLACE INTO names VALUES (?, ?)", (video_id, name))
+        return name
+
+    def _rename(self, video_id: str, old: str, new: str):
+        """Moves the files already written under the ID-only name *old*."""
+        for (extension,) in self._conn.execute("SELECT extension FROM outputs WHERE video_id = ?", (video_id,)):
+            source = os.path.join(self.output_dir, f"{old}.{extension}")
+            if os.path.exists(source):
+                os.replace(source, os.path.join(self.output_dir, f"{new}.{extension}"))
+
+    def put(self, video_id: str, filename: str, extension: str, content: str) -> Tuple[str, bool]:
+        """Writes one output unless it is already on disk unchanged.
+
+        Returns ``(path, written)``.
+        """
+        path = os.path.join(self.output_dir, f"{filename}.{extension}")
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        row = self._conn.execute(
+            "SELECT digest, size FROM outputs WHERE video_id = ? AND extension = ?", (video_id, extension)
+        ).fetchone()
+        if row is not None and row[0] == digest and _size(path) == row[1]:
+            run_metrics.count("writes_skipped")
+            return path, False
+        tmp = os.path.join(self.output_dir, f".{filename}.{extension}.{os.getpid()}.tmp")
+        with run_metrics.timed("write"):
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        run_metrics.count("bytes_written", len(data))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?)",
+            (video_id, extension, digest, len(data), time.time()),
+        )
+        return path, True
+
+    def names(self) -> Dict[str, str]:
+        """The name index: ``{video_id: filename}``."""
+        return dict(self._conn.execute("SELECT video_id, filename FROM names"))
+
+    def commit(self):
+        self._conn.commit()
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+
+def _size(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return -1
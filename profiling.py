@@ -0,0 +1,122 @@
+"""``--profile`` support for the command line tools.
+
+``profiled(prefix)`` wraps a run in cProfile and writes:
+
+* ``<prefix>.prof``: raw stats for ``pstats``, snakeviz, etc.;
+* ``<prefix>.txt``: the hottest functions by cumulative and by own time.
+
+Threads started during the run (the batch download pool, the playlist
+prefetcher) are profiled too: before Python 3.12 each gets its own profiler,
+merged into the same stats; from 3.12 cProfile is built on ``sys.monitoring``,
+which allows one profiler per process and sees every thread anyway.
+Render worker processes are not profiled; run with ``--render-processes 0``
+to see rendering in the profile.
+
+With ``memory_top`` > 0 tracemalloc runs as well and ``<prefix>.mem.txt``
+lists the source lines that allocated the most memory still held at the end
+of the run, plus the peak traced size.
+"""
+
+import io
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+# cProfile, pstats and tracemalloc are imported by profiled() only when a
+# profile is requested, keeping them off the start-up path of normal runs.
+
+DEFAULT_PREFIX = "yt2md-profile"
+TOP_FUNCTIONS = 40
+# from 3.12 one cProfile.Profile covers all threads, and a second one raises
+# "ValueError: Another profiling tool is already active"
+PROCESS_WIDE_PROFILER = sys.version_info >= (3, 12)
+
+
+class _ThreadProfiles:
+    """``threading.setprofile`` hook that starts a profiler in each new thread."""
+
+    def __init__(self):
+        self.profiles: List["cProfile.Profile"] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, frame, event, arg):
+        import cProfile
+
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler is active: leave this thread out
+            return
+        with self._lock:
+            self.profiles.append(profile)
+
+
+def _hot_spots(stats, top: int) -> str:
+    out = io.StringIO()
+    stats.stream = out
+    for key, title in (("cumulative", "cumulative time"), ("tottime", "own time")):
+        out.write(f"=== Top {top} functions by {title} ===\n")
+        stats.sort_stats(key).print_stats(top)
+    return out.getvalue()
+
+
+def _memory_report(snapshot, peak: int, top: int) -> str:
+    import tracemalloc
+
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    lines = [f"Peak traced memory: {peak / 2**20:.1f} MiB", f"=== Top {top} allocation sites ==="]
+    for stat in snapshot.statistics("lineno")[:top]:
+        lines.append(f"{stat.size / 2**10:10.1f} KiB {stat.count:8d} blocks  {stat.traceback}")
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def profiled(prefix: Optional[str], memory_top: int = 0, top: int = TOP_FUNCTIONS) -> Iterator[None]:
+    """Profiles the enclosed block; a no-op when *prefix* is None and
+    *memory_top* is 0."""
+    if prefix is None and not memory_top:
+        yield
+        return
+    prefix = prefix or DEFAULT_PREFIX
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    if memory_top:
+        tracemalloc.start()
+    thread_profiles = _ThreadProfiles()
+    if not PROCESS_WIDE_PROFILER:
+        threading.setprofile(thread_profiles)
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        if not PROCESS_WIDE_PROFILER:
+            threading.setprofile(None)
+        written = []
+        if memory_top:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            with open(f"{prefix}.mem.txt", "w", encoding="utf-8") as f:
+                f.write(_memory_report(snapshot, peak, memory_top))
+            written.append(f"{prefix}.mem.txt")
+
+        stats = pstats.Stats(profile)
+        for thread_profile in thread_profiles.profiles:
+            try:
+                stats.add(thread_profile)
+            except TypeError:  # thread never made a profiled call
+                pass
+        stats.dump_stats(f"{prefix}.prof")
+        with open(f"{prefix}.txt", "w", encoding="utf-8") as f:
+            f.write(_hot_spots(stats, top))
+        written[:0] = [f"{prefix}.prof", f"{prefix}.txt"]
+        print(f"\n🔬 Profile written to {', '.join(written)}")
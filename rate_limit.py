@@ -0,0 +1,162 @@
+"""Adaptive, per-host rate limiting for every outbound request.
+
+YouTube (transcripts and yt-dlp playlist pages) and noembed each get one
+process-wide ``HostLimiter``:
+
+* a token bucket caps the request rate;
+* an AIMD concurrency limit halves when the host throttles and grows by about
+  one slot per window of successful calls;
+* throttled calls (HTTP 429, YouTube's "request blocked" pages) are retried
+  with exponential backoff and full jitter, honouring ``Retry-After``;
+* after ``breaker_threshold`` throttled responses in a row the circuit opens
+  and every caller waits out ``breaker_cooldown`` instead of failing through
+  the rest of the batch.  The limit is at its minimum when it closes again,
+  so the first calls afterwards act as probes.
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+# host -> HostLimiter keyword arguments
+HOST_POLICIES: Dict[str, dict] = {
+    "youtube": {"rate": 5.0, "burst": 10, "concurrency": 4, "max_concurrency": 16},
+    "noembed": {"rate": 10.0, "burst": 20, "concurrency": 8, "max_concurrency": 32},
+}
+
+_limiters: Dict[str, "HostLimiter"] = {}
+_limiters_lock = threading.Lock()
+
+
+def is_throttled(exc: BaseException) -> bool:
+    """True when *exc* means "slow down" rather than a real failure."""
+    import requests
+    from youtube_transcript_api import RequestBlocked
+
+    if isinstance(exc, RequestBlocked):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code == 429
+    message = str(exc)  # yt-dlp and YouTubeRequestFailed only carry the text
+    return "HTTP Error 429" in message or "Too Many Requests" in message
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds from a ``Retry-After`` header, when the response carried one."""
+    response = getattr(exc, "response", None)
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:  # HTTP-date form; fall back to our own backoff
+        return None
+
+
+class HostLimiter:
+    """Token bucket, AIMD concurrency limit and circuit breaker for one host."""
+
+    def __init__(self, name: str, rate: float, burst: int, concurrency: int, max_concurrency: int,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0,
+                 breaker_threshold: int = 5, breaker_cooldown: float = 120.0):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+
+        self.limit = float(concurrency)
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._active = 0
+        self._streak = 0
+        self._open_until = 0.0
+        self.counters = {"calls": 0, "throttled": 0, "retries": 0, "breaker_trips": 0}
+
+    def _acquire(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now < self._open_until:
+                    self._cond.wait(self._open_until - now)
+                    continue
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+                self._refilled = now
+                if self._active >= int(self.limit):
+                    self._cond.wait()  # woken by _release
+                elif self._tokens < 1:
+                    self._cond.wait((1 - self._tokens) / self.rate)
+                else:
+                    self._tokens -= 1
+                    self._active += 1
+                    self.counters["calls"] += 1
+                    return
+
+    def _release(self, throttled: bool):
+        with self._cond:
+            self._active -= 1
+            if throttled:
+                self.counters["throttled"] += 1
+                self.limit = max(1.0, self.limit / 2)
+                self._streak += 1
+                if self._streak >= self.breaker_threshold:
+                    self._streak = 0
+                    self._open_until = time.monotonic() + self.breaker_cooldown
+                    self.counters["breaker_trips"] += 1
+                    print(f"⏸️ {self.name} keeps throttling requests; pausing for {self.breaker_cooldown:.0f}s.")
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+                self._streak = 0
+            self._cond.notify_all()
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before retry number *attempt* (0-based): full jitter over an
+        exponentially growing window, or the server's ``Retry-After``."""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Runs ``fn(*args, **kwargs)`` within this host's budget.
+
+        Throttling errors are retried up to ``max_retries`` times and then
+        re-raised; any other exception propagates immediately.
+        """
+        attempt = 0
+        while True:
+            self._acquire()
+            try:
+                value = fn(*args, **kwargs)
+            except Exception as exc:
+                throttled = is_throttled(exc)
+                self._release(throttled)
+                if not throttled or attempt >= self.max_retries:
+                    raise
+                with self._cond:
+                    self.counters["retries"] += 1
+                time.sleep(self.backoff(attempt, _retry_after(exc)))
+                attempt += 1
+                continue
+            self._release(False)
+            return value
+
+
+def limiter_for(host: str) -> HostLimiter:
+    """Returns the process-wide limiter for *host* ("youtube" or "noembed")."""
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = HostLimiter(host, **HOST_POLICIES[host])
+        return limiter
+
+
+def active_limiters() -> Dict[str, HostLimiter]:
+    """The limiters created so far in this process, by host."""
+    with _limiters_lock:
+        return dict(_limiters)
@@ -0,0 +1,132 @@
+"""Per-stage timers and counters for a batch run.
+
+The fetch path, the render stage and the writer record into one
+process-wide registry: ``timed("stage")`` accumulates call count, total and
+maximum wall time per stage, ``count("name", n)`` bumps a counter (requests,
+bytes, cache hits...) and ``failure("ErrorClass")`` tallies failures by
+exception class.  Recording is a ``perf_counter`` call and a dict update under
+a lock, so it stays on in every run.
+
+At the end of a run ``report()`` returns everything as a dict, including the
+``rate_limit`` counters, which ``write_json`` and ``write_prometheus`` (text
+exposition format, for a node_exporter textfile collector) save to disk.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+import rate_limit
+
+PREFIX = "yt2md"
+
+
+class RunMetrics:
+    """Thread-safe registry of stage timings, counters and failures."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self._start = time.perf_counter()
+            self.stages: Dict[str, list] = {}  # stage -> [count, seconds, max]
+            self.counters: Dict[str, float] = {}
+            self.failures: Dict[str, int] = {}
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                self.stages[stage] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                if seconds > entry[2]:
+                    entry[2] = seconds
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def count(self, name: str, n: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def failure(self, error: str):
+        with self._lock:
+            self.failures[error] = self.failures.get(error, 0) + 1
+
+    def report(self) -> dict:
+        with self._lock:
+            stages = {
+                stage: {"count": count, "seconds": round(seconds, 6), "max_seconds": round(longest, 6)}
+                for stage, (count, seconds, longest) in sorted(self.stages.items())
+            }
+            report = {
+                "started": self.started,
+                "wall_seconds": round(time.perf_counter() - self._start, 6),
+                "stages": stages,
+                "counters": dict(sorted(self.counters.items())),
+                "failures": dict(sorted(self.failures.items())),
+            }
+        report["rate_limits"] = {host: dict(limiter.counters) for host, limiter in rate_limit.active_limiters().items()}
+        return report
+
+
+_metrics = RunMetrics()
+
+# module-level shortcuts onto the process-wide registry
+timed = _metrics.timed
+record = _metrics.record
+count = _metrics.count
+failure = _metrics.failure
+report = _metrics.report
+reset = _metrics.reset
+
+
+def to_prometheus(data: dict) -> str:
+    """Formats a ``report()`` dict in the Prometheus text exposition format."""
+    def label(value: str) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+    lines = [
+        f"# TYPE {PREFIX}_run_wall_seconds gauge",
+        f"{PREFIX}_run_wall_seconds {data['wall_seconds']}",
+        f"# TYPE {PREFIX}_stage_calls_total counter",
+    ]
+    lines += [f'{PREFIX}_stage_calls_total{{stage="{label(s)}"}} {v["count"]}' for s, v in data["stages"].items()]
+    lines.append(f"# TYPE {PREFIX}_stage_seconds_total counter")
+    lines += [f'{PREFIX}_stage_seconds_total{{stage="{label(s)}"}} {v["seconds"]}' for s, v in data["stages"].items()]
+    lines.append(f"# TYPE {PREFIX}_stage_max_seconds gauge")
+    lines += [f'{PREFIX}_stage_max_seconds{{stage="{label(s)}"}} {v["max_seconds"]}' for s, v in data["stages"].items()]
+    lines.append(f"# TYPE {PREFIX}_events_total counter")
+    lines += [f'{PREFIX}_events_total{{name="{label(n)}"}} {v}' for n, v in data["counters"].items()]
+    lines.append(f"# TYPE {PREFIX}_failures_total counter")
+    lines += [f'{PREFIX}_failures_total{{error="{label(e)}"}} {v}' for e, v in data["failures"].items()]
+    lines.append(f"# TYPE {PREFIX}_rate_limit_events_total counter")
+    for host, counters in data.get("rate_limits", {}).items():
+        lines += [
+            f'{PREFIX}_rate_limit_events_total{{host="{label(host)}",event="{label(event)}"}} {v}'
+            for event, v in counters.items()
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def write_json(path: str, data: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def write_prometheus(path: str, data: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(to_prometheus(data))
@@ -0,0 +1,154 @@
+"""Full-text search over every downloaded transcript.
+
+The batch pipeline adds each fetched transcript to ``.yt2md-search.sqlite3``
+in the output directory, split into passages of about ``PASSAGE_SECONDS``
+that remember where they start, and indexed with SQLite FTS5.  A search
+returns the best-ranked (BM25) passages with the video, its title and a
+``youtube.com/watch?v=…&t=…`` link to the moment the words are spoken:
+
+    python batch_processing_yt.py search "gradient descent" -o my_transcripts
+
+Updates are incremental: a video whose transcript is unchanged (same
+digest) is not re-indexed, and ``catch_up`` indexes only the videos the
+transcript archive has that the index has not seen or that were re-fetched
+since, e.g. an output directory filled before the index existed.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+import run_metrics
+from transcript_segments import timestamp_url
+
+INDEX_NAME = ".yt2md-search.sqlite3"
+PASSAGE_SECONDS = 30.0
+
+
+class SearchIndex:
+    """FTS5 index of transcript passages, keyed by video ID."""
+
+    def __init__(self, output_dir: str, path: Optional[str] = None):
+        self.path = path or os.path.join(output_dir, INDEX_NAME)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS videos (
+                   video_id TEXT PRIMARY KEY,
+                   title TEXT NOT NULL,
+                   author TEXT,
+                   digest TEXT NOT NULL,
+                   indexed_at REAL NOT NULL
+               );
+               CREATE TABLE IF NOT EXISTS passages (
+                   id INTEGER PRIMARY KEY,
+                   video_id TEXT NOT NULL,
+                   start REAL NOT NULL,
+                   text TEXT NOT NULL
+               );
+               CREATE INDEX IF NOT EXISTS passages_video ON passages (video_id);
+               CREATE VIRTUAL TABLE IF NOT EXISTS passages_fts USING fts5 (
+                   text, content='passages', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+               );
+               CREATE TRIGGER IF NOT EXISTS passages_ai AFTER INSERT ON passages BEGIN
+                   INSERT INTO passages_fts (rowid, text) VALUES (new.id, new.text);
+               END;
+               CREATE TRIGGER IF NOT EXISTS passages_ad AFTER DELETE ON passages BEGIN
+                   INSERT INTO passages_fts (passages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+               END;"""
+        )
+        self._conn.commit()
+
+    def add(self, video_id: str, info: dict, snippets: List[dict]) -> bool:
+        """Indexes (or re-indexes) one transcript; returns False when it was
+        already indexed with the same content."""
+        digest = hashlib.sha256(
+            json.dumps([[s["start"], s["text"]] for s in snippets], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        with self._lock:
+            row = self._conn.execute("SELECT digest FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+            if row is not None and row[0] == digest:
+                self._conn.execute("UPDATE videos SET indexed_at = ? WHERE video_id = ?", (time.time(), video_id))
+                self._conn.commit()
+                run_metrics.count("index_unchanged")
+                return False
+            with run_metrics.timed("index"):
+                self._conn.execute("DELETE FROM passages WHERE video_id = ?", (video_id,))
+                self._conn.executemany(
+                    "INSERT INTO passages (video_id, start, text) VALUES (?, ?, ?)",
+                    [(video_id, start, text) for start, text in _passages(snippets)],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?)",
+                    (video_id, info.get("title", ""), info.get("author_name"), digest, time.time()),
+                )
+                self._conn.commit()
+        return True
+
+    def catch_up(self, archive) -> int:
+        """Indexes the archived transcripts (a ``TranscriptArchive``) that are
+        missing from the index or were fetched again since they were indexed.
+        Returns how many videos were (re-)indexed."""
+        with self._lock:
+            indexed = dict(self._conn.execute("SELECT video_id, indexed_at FROM videos"))
+        added = 0
+        for video_id, fetched_at in archive.fetch_times().items():
+            if video_id in indexed and indexed[video_id] >= fetched_at:
+                continue
+            record = archive.get(video_id)
+            if record is not None and self.add(video_id, record["info"], record["snippets"]):
+                added += 1
+        return added
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        """Best-ranked passages for *query* (FTS5 syntax: words, "phrases",
+        OR, NOT, prefix*).  Each hit has ``video_id``, ``title``, ``start``,
+        ``url`` and a highlighted ``snippet``."""
+        sql = """SELECT p.video_id, v.title, p.start,
+                        snippet(passages_fts, 0, '[', ']', '…', 16)
+                 FROM passages_fts
+                 JOIN passages p ON p.id = passages_fts.rowid
+                 JOIN videos v ON v.video_id = p.video_id
+                 WHERE passages_fts MATCH ?
+                 ORDER BY rank LIMIT ?"""
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, (query, limit)).fetchall()
+            except sqlite3.OperationalError:
+                # not valid FTS5 syntax (e.g. "don't"): search the words literally
+                quoted = " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+                rows = self._conn.execute(sql, (quoted, limit)).fetchall()
+        return [
+            {"video_id": video_id, "title": title, "start": start,
+             "url": timestamp_url(video_id, start), "snippet": snippet}
+            for video_id, title, start, snippet in rows
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _passages(snippets: List[dict]):
+    """Groups consecutive snippets into ``(start, text)`` passages of about
+    ``PASSAGE_SECONDS``."""
+    start, texts = None, []
+    for snippet in snippets:
+        if start is None:
+            start = snippet["start"]
+        texts.append(snippet["text"].replace("\n", " "))
+        if snippet["start"] + snippet.get("duration", 0.0) - start >= PASSAGE_SECONDS:
+            yield start, " ".join(texts)
+            start, texts = None, []
+    if texts:
+        yield start, " ".join(texts)
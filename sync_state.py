@@ -0,0 +1,144 @@
+"""Per-source watermarks for ``batch_processing_yt.py --sync``.
+
+For every playlist or channel URL that has been synced into an output
+directory, ``.yt2md-sync.sqlite3`` remembers which videos were processed,
+when, how it went and which caption track was used.  A nightly sync then
+only processes
+
+* videos it has not seen before; on a channel or uploads feed (newest
+  first) expansion of each tab (Videos, Live, Shorts) stops after
+  ``SYNC_OVERLAP`` videos in a row that are already known, so the listing
+  itself costs a page or two per tab instead of the whole channel;
+* videos that failed for a transient reason (network, throttling) last
+  time, wherever they are in the listing;
+* with ``recheck_days``, videos that had no captions or only auto-generated
+  or translated ones when last processed more than that many days ago, in
+  case manual captions have been added since.
+"""
+
+import os
+import sqlite3
+import time
+from typing import Container, Dict, Iterable, Iterator, List, Optional, Set
+
+SYNC_NAME = ".yt2md-sync.sqlite3"
+SYNC_OVERLAP = 30
+# failures that will not go away by retrying tomorrow
+FINAL_ERRORS = ("NoTranscriptFound", "TranscriptsDisabled", "VideoUnavailable")
+RECHECK_ERRORS = ("NoTranscriptFound", "TranscriptsDisabled")
+RECHECK_TRACKS = ("generated", "translated")
+
+
+class SyncState:
+    """Processed videos per sync source, in a SQLite file."""
+
+    def __init__(self, output_dir: str, path: Optional[str] = None):
+        self.path = path or os.path.join(output_dir, SYNC_NAME)
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS sources (
+                   url TEXT PRIMARY KEY,
+                   last_sync REAL NOT NULL
+               );
+               CREATE TABLE IF NOT EXISTS videos (
+                   url TEXT NOT NULL,
+                   video_id TEXT NOT NULL,
+                   status TEXT NOT NULL,
+                   error TEXT,
+                   track TEXT,
+                   processed_at REAL NOT NULL,
+                   PRIMARY KEY (url, video_id)
+               );"""
+        )
+        self._conn.commit()
+
+    def last_sync(self, url: str) -> Optional[float]:
+        row = self._conn.execute("SELECT last_sync FROM sources WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def known(self, url: str) -> Dict[str, dict]:
+        """Videos of *url* that need no retry: ``{video_id: record}``."""
+        rows = self._conn.execute(
+            "SELECT video_id, status, error, track, processed_at FROM videos WHERE url = ?", (url,)
+        )
+        return {
+            video_id: {"status": status, "error": error, "track": track, "processed_at": processed_at}
+            for video_id, status, error, track, processed_at in rows
+            if status == "ok" or error in FINAL_ERRORS
+        }
+
+    def retry_due(self, url: str) -> List[str]:
+        """Videos of *url* whose last attempt failed for a transient reason."""
+        placeholders = ", ".join("?" * len(FINAL_ERRORS))
+        rows = self._conn.execute(
+            f"SELECT video_id FROM videos WHERE url = ? AND status != 'ok' AND error NOT IN ({placeholders})",
+            (url, *FINAL_ERRORS),
+        )
+        return [row[0] for row in rows]
+
+    def recheck_due(self, url: str, days: float) -> List[str]:
+        """Videos of *url* whose captions were missing or not manual when last
+        processed, more than *days* days ago."""
+        cutoff = time.time() - days * 86400
+        return [
+            video_id for video_id, record in self.known(url).items()
+            if record["processed_at"] < cutoff and (
+                record["error"] in RECHECK_ERRORS
+                or (record["track"] or "").split(":", 1)[0] in RECHECK_TRACKS
+            )
+        ]
+
+    def new_entries(self, url: str, entries: Iterable[dict], known: Container[str],
+                    finished_tabs: Optional[Set[str]] = None) -> Iterator[dict]:
+        """Filters the playlist *entries* of *url* down to videos not in
+        *known*, stopping early on newest-first feeds (see the module
+        docstring).
+
+        The stop rule applies per ``tab`` of the entries: a tab that is done
+        is added to *finished_tabs*, which ``iter_playlist_entries`` then
+        skips ahead of, and the other tabs are still read.  Without
+        *finished_tabs* (or ``tab``) the first tab that is done ends the
+        listing.
+        """
+        newest_first = "list=" not in url or "list=UU" in url
+        streaks = {}
+        for entry in entries:
+            tab = entry.get("tab")
+            if tab in (finished_tabs or ()):
+                continue
+            if entry["id"] not in known:
+                streaks[tab] = 0
+                yield entry
+                continue
+            streaks[tab] = streaks.get(tab, 0) + 1
+            if newest_first and streaks[tab] >= SYNC_OVERLAP:
+                if finished_tabs is None or tab is None:
+                    return
+                finished_tabs.add(tab)
+
+    def record(self, url: str, result: dict):
+        """Stores one processed video (a ``process_batch`` result dict).
+
+        A transient failure does not overwrite an earlier record, so a video
+        whose recheck hit a network error keeps its place in the watermark.
+        """
+        if result["status"] != "ok" and result.get("error") not in FINAL_ERRORS:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO videos VALUES (?, ?, ?, ?, ?, ?)",
+                (url, result["video_id"], result["status"], result.get("error"), result.get("track"), time.time()),
+            )
+            self._conn.commit()
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?, ?)",
+            (url, result["video_id"], result["status"], result.get("error"), result.get("track"), time.time()),
+        )
+        self._conn.commit()
+
+    def mark_synced(self, url: str):
+        self._conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?)", (url, time.time()))
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
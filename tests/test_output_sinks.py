@@ -0,0 +1,152 @@
+"""Round trips through every packed sink, and recovery after a crash."""
+
+import gzip
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tarfile
+import zipfile
+
+import pytest
+
+import output_sinks
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KINDS = ["jsonl", "jsonl.gz", "sqlite", "tar", "zip"]
+INFO = {"title": "A title", "author_name": "Someone"}
+
+
+def stored(kind, location):
+    """``{member: content}`` as read back with standard tools."""
+    if kind.startswith("jsonl"):
+        opener = gzip.open if kind == "jsonl.gz" else open
+        with opener(location, "rt", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        return {f"{r['filename']}.{ext}": content for r in records for ext, content in r["outputs"].items()}
+    if kind == "sqlite":
+        with sqlite3.connect(location) as conn:
+            return {f"{name}.{ext}": content for name, ext, content in
+                    conn.execute("SELECT filename, extension, content FROM outputs")}
+    if kind == "tar":
+        with tarfile.open(location) as archive:
+            return {m.name: archive.extractfile(m).read().decode("utf-8") for m in archive.getmembers()}
+    with zipfile.ZipFile(location) as archive:
+        return {name: archive.read(name).decode("utf-8") for name in archive.namelist()}
+
+
+def write_video(sink, n, text="x"):
+    name = f"video_{n}"
+    sink.write(f"vid{n:08d}", name, INFO, [("md", f"# {n}\n{text}"), ("txt", f"{n} {text}")])
+    return {f"{name}.md": f"# {n}\n{text}", f"{name}.txt": f"{n} {text}"}
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_round_trip_and_append(tmp_path, kind):
+    expected = {}
+    sink = output_sinks.open_sink(kind, str(tmp_path))
+    for n in range(3):
+        expected.update(write_video(sink, n))
+    sink.flush()
+    expected.update(write_video(sink, 3))
+    sink.close()
+
+    sink = output_sinks.open_sink(kind, str(tmp_path))  # a --resume run appends
+    expected.update(write_video(sink, 4))
+    sink.close()
+    assert stored(kind, sink.location) == expected
+
+
+def test_zstd_needs_zstandard(tmp_path):
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        with pytest.raises(RuntimeError):
+            output_sinks.open_sink("jsonl.zst", str(tmp_path))
+    else:
+        sink = output_sinks.open_sink("jsonl.zst", str(tmp_path))
+        write_video(sink, 0)
+        sink.close()
+        with open(sink.location, "rb") as f:
+            assert b"vid00000000" in zstandard.ZstdDecompressor().decompressobj().decompress(f.read())
+
+
+CRASHING_RUN = """
+import os, sys
+sys.path.insert(0, {repo!r})
+import output_sinks
+sink = output_sinks.open_sink({kind!r}, {output_dir!r})
+for n in range(3):
+    sink.write("vid%08d" % n, "video_%d" % n, {{"title": "t"}}, [("md", "flushed %d" % n)])
+sink.flush()
+for n in range(3, 6):
+    sink.write("vid%08d" % n, "video_%d" % n, {{"title": "t"}}, [("md", "lost %d" % n)])
+if {kind!r}.startswith("jsonl"):
+    sink._raw.write(b"\\x1f\\x8b\\x08 torn")
+elif {kind!r} == "tar":
+    sink._archive.fileobj.write(b"half a header")
+os._exit(1)
+"""
+
+
+@pytest.mark.parametrize("kind", ["jsonl", "jsonl.gz", "tar", "zip"])
+def test_crash_keeps_flushed_batches(tmp_path, kind):
+    script = CRASHING_RUN.format(repo=REPO, kind=kind, output_dir=str(tmp_path))
+    assert subprocess.run([sys.executable, "-c", script]).returncode == 1
+
+    sink = output_sinks.open_sink(kind, str(tmp_path))
+    sink.write("vid00000009", "video_9", INFO, [("md", "after")])
+    sink.close()
+    assert stored(kind, sink.location) == {
+        "video_0.md": "flushed 0", "video_1.md": "flushed 1", "video_2.md": "flushed 2", "video_9.md": "after",
+    }
+
+
+def test_directory_sink_writes_files(tmp_path):
+    sink = output_sinks.open_sink("dir", str(tmp_path))
+    name = sink.name_for("vid00000001", {"title": "Hello: World?"})
+    paths = sink.write("vid00000001", name, INFO, [("md", "# hi")])
+    sink.close()
+    assert [os.path.basename(p) for p in paths] == [f"{name}.md"]
+    with open(paths[0], encoding="utf-8") as f:
+        assert f.read() == "# hi"
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_names_do_not_collide(tmp_path, kind):
+    sink = output_sinks.open_sink(kind, str(tmp_path))
+    names = [sink.name_for(video_id, {"title": title}) for video_id, title in (
+        ("vid00000001", "Same"), ("vid00000002", "Same"), ("vid00000003", "Unknown Title"), ("vid00000004", "???"),
+    )]
+    assert names == ["Same", "Same_vid00000002", "vid00000003", "vid00000004"]
+    assert sink.name_for("vid00000001", {"title": "Same"}) == "Same"
+    for video_id, name in zip(("vid00000001", "vid00000002"), names):
+        sink.write(video_id, name, INFO, [("md", video_id)])
+    sink.close()
+    assert stored(kind, sink.location) == {"Same.md": "vid00000001", "Same_vid00000002.md": "vid00000002"}
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "tar", "zip"])
+def test_names_from_earlier_runs_are_taken(tmp_path, kind):
+    sink = output_sinks.open_sink(kind, str(tmp_path))
+    sink.write("vid00000001", sink.name_for("vid00000001", {"title": "Same"}), INFO, [("md", "first")])
+    sink.close()
+    sink = output_sinks.open_sink(kind, str(tmp_path))
+    assert sink.name_for("vid00000002", {"title": "Same"}) == "Same_vid00000002"
+    sink.close()
+
+
+@pytest.mark.parametrize("kind", ["jsonl.gz", "tar", "zip"])
+def test_crash_after_a_clean_run(tmp_path, kind):
+    sink = output_sinks.open_sink(kind, str(tmp_path))
+    sink.write("vid00000008", "video_8", INFO, [("md", "earlier run")])
+    sink.close()
+    script = CRASHING_RUN.format(repo=REPO, kind=kind, output_dir=str(tmp_path))
+    assert subprocess.run([sys.executable, "-c", script]).returncode == 1
+
+    sink = output_sinks.open_sink(kind, str(tmp_path))
+    sink.close()
+    assert stored(kind, sink.location) == {
+        "video_8.md": "earlier run", "video_0.md": "flushed 0", "video_1.md": "flushed 1", "video_2.md": "flushed 2",
+    }
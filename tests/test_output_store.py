@@ -0,0 +1,72 @@
+"""File naming and change detection of the default ``dir`` output."""
+
+import os
+
+import pytest
+
+from output_store import OutputStore
+from video_metadata import UNKNOWN_INFO
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = OutputStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+def test_same_title_gets_video_id_suffix(store):
+    assert store.name_for("aaaaaaaaaaa", "Same Title") == "Same_Title"
+    assert store.name_for("bbbbbbbbbbb", "Same Title") == "Same_Title_bbbbbbbbbbb"
+    # names stay fixed once given
+    assert store.name_for("aaaaaaaaaaa", "Same Title") == "Same_Title"
+    assert store.name_for("aaaaaaaaaaa", "Renamed Upstream") == "Same_Title"
+
+
+def test_names_survive_reopening(tmp_path):
+    store = OutputStore(str(tmp_path))
+    store.name_for("aaaaaaaaaaa", "Same Title")
+    store.name_for("bbbbbbbbbbb", "Same Title")
+    store.close()
+    reopened = OutputStore(str(tmp_path))
+    assert reopened.name_for("bbbbbbbbbbb", "Same Title") == "Same_Title_bbbbbbbbbbb"
+    assert reopened.names() == {"aaaaaaaaaaa": "Same_Title", "bbbbbbbbbbb": "Same_Title_bbbbbbbbbbb"}
+    reopened.close()
+
+
+def test_unknown_title_is_renamed_once_known(tmp_path, store):
+    name = store.name_for("ccccccccccc", UNKNOWN_INFO["title"])
+    assert name == "ccccccccccc"
+    store.put("ccccccccccc", name, "md", "# text")
+
+    name = store.name_for("ccccccccccc", "Real Title")
+    assert name == "Real_Title"
+    files = os.listdir(tmp_path)
+    assert "Real_Title.md" in files and "ccccccccccc.md" not in files
+
+
+def test_long_titles_fit_the_file_system(tmp_path, store):
+    name = store.name_for("ddddddddddd", "字" * 120)
+    path, written = store.put("ddddddddddd", name, "md", "# text")
+    assert written and os.path.exists(path)
+    assert len(os.path.basename(path).encode("utf-8")) < 255
+
+
+def test_unchanged_output_is_not_rewritten(store):
+    path, written = store.put("eeeeeeeeeee", "video", "md", "# one")
+    assert written
+    os.utime(path, (0, 0))
+
+    assert store.put("eeeeeeeeeee", "video", "md", "# one") == (path, False)
+    assert os.stat(path).st_mtime == 0
+
+    assert store.put("eeeeeeeeeee", "video", "md", "# two") == (path, True)
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "# two"
+
+
+def test_missing_file_is_written_again(store):
+    path, _ = store.put("fffffffffff", "video", "md", "# one")
+    os.remove(path)
+    assert store.put("fffffffffff", "video", "md", "# one") == (path, True)
+    assert os.path.exists(path)
@@ -0,0 +1,176 @@
+"""Token bucket, AIMD limit, retries and circuit breaker of ``HostLimiter``,
+on a fake clock."""
+
+import pytest
+import requests
+from youtube_transcript_api import RequestBlocked
+
+import rate_limit
+from rate_limit import HostLimiter, is_throttled
+
+
+class FakeClock:
+    """Stands in for ``time`` in rate_limit; sleeping and waiting advance it."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeCondition:
+    """A single-threaded ``threading.Condition`` whose waits advance the clock."""
+
+    def __init__(self, clock):
+        self.clock = clock
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def wait(self, timeout=None):
+        assert timeout is not None, "would wait forever"
+        self.clock.now += timeout
+
+    def notify_all(self):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def limiter(clock, **overrides):
+    options = dict(rate=2.0, burst=3, concurrency=4, max_concurrency=8,
+                   breaker_threshold=3, breaker_cooldown=100.0)
+    options.update(overrides)
+    host = HostLimiter("test", **options)
+    host._cond = FakeCondition(clock)
+    return host
+
+
+def http_error(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+def test_token_bucket_paces_calls_after_the_burst(clock):
+    host = limiter(clock)
+    for _ in range(3):
+        assert host.call(lambda: "ok") == "ok"
+    assert clock.now == 0.0
+    host.call(lambda: "ok")
+    assert clock.now == pytest.approx(0.5)  # one token at 2 per second
+    assert host.counters["calls"] == 4
+
+
+def test_limit_halves_on_throttling_and_grows_back(clock):
+    host = limiter(clock, concurrency=8)
+    host._active = 1
+    host._release(throttled=True)
+    assert host.limit == 4.0
+    for _ in range(2):
+        host._active = 1
+        host._release(throttled=True)
+    assert host.limit == 1.0
+    host._open_until = 0.0
+
+    for _ in range(3):
+        host._active = 1
+        host._release(throttled=False)
+    assert 2.0 < host.limit < 3.0  # about one slot per window of successes
+    for _ in range(200):
+        host._active = 1
+        host._release(throttled=False)
+    assert host.limit == 8.0  # capped at max_concurrency
+
+
+def test_retry_after_is_honoured(clock):
+    host = limiter(clock)
+    responses = [http_error(429, {"Retry-After": "7"}), "done"]
+
+    def fn():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    assert host.call(fn) == "done"
+    assert clock.sleeps == [7.0]
+    assert host.counters["retries"] == 1 and host.counters["throttled"] == 1
+
+
+def test_backoff_is_jittered_and_capped(clock):
+    host = limiter(clock, base_delay=1.0, max_delay=10.0)
+    for attempt in range(6):
+        assert 0 <= host.backoff(attempt) <= min(10.0, 2 ** attempt)
+    assert host.backoff(0, retry_after=500) == 10.0
+
+
+def test_other_errors_are_not_retried(clock):
+    host = limiter(clock)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise ValueError("broken")
+
+    with pytest.raises(ValueError):
+        host.call(fn)
+    assert len(calls) == 1 and clock.sleeps == []
+    assert host.limit == 4.0 + 1 / 4.0  # counts as a success for the AIMD limit
+
+
+def test_gives_up_after_max_retries(clock):
+    host = limiter(clock, max_retries=2, breaker_threshold=10)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise http_error(429)
+
+    with pytest.raises(requests.HTTPError):
+        host.call(fn)
+    assert len(calls) == 3 and len(clock.sleeps) == 2
+
+
+def test_breaker_opens_and_closes(clock, capsys):
+    host = limiter(clock, max_retries=0)
+
+    def throttled():
+        raise http_error(429)
+
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError):
+            host.call(throttled)
+    assert host.counters["breaker_trips"] == 1
+    assert "pausing" in capsys.readouterr().out
+    tripped_at = clock.now
+
+    assert host.call(lambda: "probe") == "probe"  # waits out the cooldown
+    assert clock.now >= tripped_at + 100.0
+    assert host.limit == 2.0  # minimum limit plus one successful window
+
+
+@pytest.mark.parametrize("exc, throttled", [
+    (RequestBlocked("vid00000001"), True),
+    (http_error(429), True),
+    (http_error(500), False),
+    (Exception("ERROR: unable to download webpage: HTTP Error 429: Too Many Requests"), True),
+    (ValueError("no captions"), False),
+])
+def test_is_throttled(exc, throttled):
+    assert is_throttled(exc) is throttled
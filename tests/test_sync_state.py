@@ -0,0 +1,132 @@
+"""Per-source watermarks behind ``--sync``."""
+
+import time
+
+import pytest
+
+import sync_state
+from sync_state import SYNC_OVERLAP, SyncState
+
+CHANNEL = "https://www.youtube.com/@someone/videos"
+PLAYLIST = "https://www.youtube.com/playlist?list=PLsomething"
+
+
+@pytest.fixture
+def state(tmp_path):
+    state = SyncState(str(tmp_path))
+    yield state
+    state.close()
+
+
+def ok(video_id, track="manual:en"):
+    return {"video_id": video_id, "status": "ok", "error": None, "track": track}
+
+
+def failed(video_id, error):
+    return {"video_id": video_id, "status": "error", "error": error, "track": None}
+
+
+def entries(ids):
+    return [{"id": video_id} for video_id in ids]
+
+
+def test_known_and_retry_due(state):
+    state.record(CHANNEL, ok("v1"))
+    state.record(CHANNEL, failed("v2", "TranscriptsDisabled"))
+    state.record(CHANNEL, failed("v3", "ConnectionError"))
+    state.record(PLAYLIST, ok("v4"))
+    assert set(state.known(CHANNEL)) == {"v1", "v2"}
+    assert state.retry_due(CHANNEL) == ["v3"]
+
+    state.record(CHANNEL, ok("v3"))
+    assert set(state.known(CHANNEL)) == {"v1", "v2", "v3"}
+    assert state.retry_due(CHANNEL) == []
+
+
+def test_transient_failure_keeps_earlier_record(state):
+    state.record(CHANNEL, ok("v1", "generated:en"))
+    state.record(CHANNEL, failed("v1", "ConnectionError"))
+    assert state.known(CHANNEL)["v1"]["track"] == "generated:en"
+
+
+def test_newest_first_feed_stops_after_overlap(state):
+    known = {f"old{n}" for n in range(100)}
+    feed = entries(["new1", "new2"] + [f"old{n}" for n in range(100)] + ["older"])
+    assert [e["id"] for e in state.new_entries(CHANNEL, feed, known)] == ["new1", "new2"]
+
+    # a gap of fewer than SYNC_OVERLAP known videos does not stop it
+    gap = entries([f"old{n}" for n in range(SYNC_OVERLAP - 1)] + ["new3"])
+    assert [e["id"] for e in state.new_entries(CHANNEL, gap, known)] == ["new3"]
+
+
+def test_playlist_is_read_to_the_end(state):
+    known = {f"old{n}" for n in range(100)}
+    playlist = entries([f"old{n}" for n in range(100)] + ["appended"])
+    assert [e["id"] for e in state.new_entries(PLAYLIST, playlist, known)] == ["appended"]
+
+
+def test_recheck_due(state, monkeypatch):
+    state.record(CHANNEL, ok("manual", "manual:en"))
+    state.record(CHANNEL, ok("auto", "generated:en"))
+    state.record(CHANNEL, failed("none", "NoTranscriptFound"))
+    state.record(CHANNEL, failed("gone", "VideoUnavailable"))
+    assert state.recheck_due(CHANNEL, 7) == []
+
+    later = time.time() + 8 * 86400
+    monkeypatch.setattr(sync_state.time, "time", lambda: later)
+    assert sorted(state.recheck_due(CHANNEL, 7)) == ["auto", "none"]
+
+
+def test_mark_synced(state):
+    assert state.last_sync(CHANNEL) is None
+    state.mark_synced(CHANNEL)
+    assert state.last_sync(CHANNEL) == pytest.approx(time.time(), abs=60)
+
+
+def test_overlap_applies_per_channel_tab(state):
+    known = {f"old{n}" for n in range(100)}
+    tabs = {
+        "videos": [f"old{n}" for n in range(100)],
+        "streams": ["live1"] + [f"old{n}" for n in range(40)] + ["live2"],
+        "shorts": ["short1"],
+    }
+    listed = []
+
+    def listing(finished_tabs):
+        for tab, ids in tabs.items():
+            for video_id in ids:
+                listed.append(video_id)
+                yield {"id": video_id, "tab": tab}
+                if tab in finished_tabs:
+                    break
+
+    finished = set()
+    new = [e["id"] for e in state.new_entries(CHANNEL, listing(finished), known, finished)]
+    assert new == ["live1", "short1"]
+    assert finished == {"videos", "streams"}
+    assert len(listed) == SYNC_OVERLAP + 1 + SYNC_OVERLAP + 1
+
+
+def test_rechecks_bypass_the_caches(tmp_path, monkeypatch):
+    import batch_processing_yt
+    import transcript_pipeline
+
+    calls = {}
+
+    def fetch(video_id, language, refresh=None, **kwargs):
+        calls[video_id] = refresh
+        return [{"text": "Hello.", "start": 0.0, "duration": 1.0}], "generated:en"
+
+    monkeypatch.setattr(transcript_pipeline, "fetch_transcript", fetch)
+    monkeypatch.setattr(transcript_pipeline, "_resolve_video_info",
+                        lambda video_id, entry: {"title": video_id, "author_name": "A", "thumbnail_url": ""})
+    monkeypatch.setattr(batch_processing_yt, "iter_playlist_entries",
+                        lambda url, limit=None, finished_tabs=None: iter(entries(["old", "new"])))
+    state = SyncState(str(tmp_path))
+    state.record(CHANNEL, ok("old", "generated:en"))
+    later = time.time() + 8 * 86400
+    monkeypatch.setattr(sync_state.time, "time", lambda: later)
+
+    batch_processing_yt.sync_sources([CHANNEL], "en", ["md"], str(tmp_path), state, recheck_days=7)
+    state.close()
+    assert calls == {"old": True, "new": None}
@@ -0,0 +1,33 @@
+"""Unchanged transcripts are not rewritten in the archive."""
+
+import sqlite3
+
+from transcript_archive import TranscriptArchive
+
+INFO = {"title": "A title", "author_name": "Someone"}
+SNIPPETS = [{"text": "Hello.", "start": 0.0, "duration": 1.5}]
+
+
+def test_unchanged_transcript_is_not_rewritten(tmp_path):
+    archive = TranscriptArchive(str(tmp_path))
+    assert archive.put("vid00000001", "en", "manual:en", INFO, SNIPPETS)
+    fetched_at = archive.fetch_times()["vid00000001"]
+
+    assert not archive.put("vid00000001", "en", "manual:en", INFO, SNIPPETS)
+    assert archive.fetch_times()["vid00000001"] == fetched_at
+
+    assert archive.put("vid00000001", "en", "generated:en", INFO, SNIPPETS)
+    assert archive.put("vid00000001", "en", "generated:en", INFO, SNIPPETS + SNIPPETS)
+    assert archive.get("vid00000001")["snippets"] == SNIPPETS + SNIPPETS
+    archive.close()
+
+
+def test_archive_without_digests_is_upgraded(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    with sqlite3.connect(path) as conn:
+        conn.execute("""CREATE TABLE transcripts (video_id TEXT PRIMARY KEY, language TEXT NOT NULL,
+                        track TEXT NOT NULL, info TEXT NOT NULL, data BLOB NOT NULL, fetched_at REAL NOT NULL)""")
+    archive = TranscriptArchive(str(tmp_path), path)
+    assert archive.put("vid00000001", "en", "manual:en", INFO, SNIPPETS)
+    assert not archive.put("vid00000001", "en", "manual:en", INFO, SNIPPETS)
+    archive.close()
@@ -0,0 +1,116 @@
+"""Caption track selection: ``TrackPolicy`` and ``resolve_track``."""
+
+import pytest
+import requests
+
+import transcript_cache
+import transcript_helper
+from transcript_cache import TrackCache
+from transcript_helper import TrackPolicy, fetch_transcript, resolve_track
+
+
+class FakeTranscript:
+    """The parts of ``youtube_transcript_api.Transcript`` the resolver uses."""
+
+    def __init__(self, code, generated=False, translations=(), error=None, translation_error=None):
+        self.language_code = code
+        self.language = code.upper()
+        self.is_generated = generated
+        self.is_translatable = bool(translations)
+        self.translation_languages = [{"language_code": t, "language": t.upper()} for t in translations]
+        self.error = error
+        self.translation_error = translation_error
+        self.fetched = 0
+
+    def translate(self, code):
+        return FakeTranscript(code, self.is_generated, error=self.translation_error)
+
+    def fetch(self):
+        self.fetched += 1
+        if self.error is not None:
+            raise self.error
+        return [{"text": self.language_code, "start": 0.0, "duration": 1.0}]
+
+
+def listing(*transcripts):
+    """Manual tracks first, as ``TranscriptList`` iterates."""
+    return sorted(transcripts, key=lambda t: t.is_generated)
+
+
+@pytest.fixture
+def live(monkeypatch):
+    """Serves a fake listing instead of asking YouTube."""
+    tracks = {}
+    monkeypatch.setattr(transcript_helper, "_live_listing", lambda video_id: tracks[video_id])
+    return tracks
+
+
+def test_candidates_follow_the_policy():
+    tracks = listing(
+        FakeTranscript("de", translations=("en",)),
+        FakeTranscript("en", generated=True),
+        FakeTranscript("en-GB"),
+    )
+    found = [track for track, _ in TrackPolicy(["en", "en-GB"]).candidates(tracks)]
+    assert found == ["manual:en-GB", "generated:en", "translated:de->en", "any:de"]
+
+    found = [track for track, _ in TrackPolicy(["en"], ["generated", "manual"]).candidates(tracks)]
+    assert found == ["generated:en"]
+
+
+def test_policy_key_keeps_plain_language_keys():
+    assert TrackPolicy(["en"]).key == "en"
+    assert TrackPolicy(["en", "de"], ["manual"]).key == "en,de|manual"
+    with pytest.raises(ValueError):
+        TrackPolicy(["en"], ["subtitles"])
+
+
+def test_failed_translation_falls_through(live):
+    live["vid"] = listing(FakeTranscript("de", translations=("en",), translation_error=ValueError("no translation")))
+    fetched, track, _ = resolve_track("vid", TrackPolicy(["en"], ["translated", "any"]))
+    assert track == "any:de" and fetched[0]["text"] == "de"
+
+
+def test_throttled_translation_is_raised(live):
+    response = requests.Response()
+    response.status_code = 429
+    live["vid"] = listing(FakeTranscript("de", translations=("en",),
+                                                translation_error=requests.HTTPError(response=response)))
+    with pytest.raises(requests.HTTPError):
+        resolve_track("vid", TrackPolicy(["en"], ["translated", "any"]))
+
+
+def test_remembered_choice_is_tried_first(live, tmp_path):
+    manual, generated = FakeTranscript("en"), FakeTranscript("en", generated=True)
+    live["vid"] = listing(manual, generated)
+    cache = TrackCache(str(tmp_path / "tracks.sqlite3"))
+    policy = TrackPolicy(["en"])
+    cache.put("vid", transcript_helper._describe(live["vid"]), {policy.key: "generated:en"})
+
+    _, track, _ = resolve_track("vid", policy, cache)
+    assert track == "generated:en" and manual.fetched == 0
+
+    _, track, _ = resolve_track("vid", policy, cache, refresh=True)
+    assert track == "manual:en"
+    assert cache.get("vid")[1] == {policy.key: "manual:en"}
+    cache.close()
+
+
+def test_stale_choice_is_dropped_when_the_listing_changes(live, tmp_path):
+    live["vid"] = listing(FakeTranscript("en", generated=True))
+    cache = TrackCache(str(tmp_path / "tracks.sqlite3"))
+    policy = TrackPolicy(["en"])
+    resolve_track("vid", policy, cache)
+    assert cache.get("vid")[1] == {policy.key: "generated:en"}
+
+    live["vid"] = listing(FakeTranscript("en"), FakeTranscript("en", generated=True))  # manual captions added
+    _, track, listing_now = resolve_track("vid", policy, cache)
+    assert track == "manual:en"
+    assert cache.get("vid") == (listing_now, {policy.key: "manual:en"})
+    cache.close()
+
+
+def test_language_list_is_stripped(live, monkeypatch):
+    monkeypatch.setitem(transcript_cache._settings, "enabled", False)
+    live["vid"] = listing(FakeTranscript("en-GB"))
+    assert fetch_transcript("vid", "en, en-GB", refresh=True)[1] == "manual:en-GB"
@@ -0,0 +1,25 @@
+"""Error classification in ``TranscriptPipeline.fetch``."""
+
+import pytest
+from youtube_transcript_api import TranscriptsDisabled, VideoUnavailable
+
+import transcript_pipeline
+from transcript_pipeline import TranscriptPipeline
+
+
+@pytest.mark.parametrize("error, expected", [
+    (TranscriptsDisabled("vid00000001"), "TranscriptsDisabled"),
+    (VideoUnavailable("vid00000001"), "VideoUnavailable"),
+    (ConnectionError("reset"), "ConnectionError"),
+])
+def test_fetch_reports_the_wrapped_error(monkeypatch, error, expected):
+    def fetch(video_id, language, **kwargs):
+        # as transcript_helper.fetch_transcript does
+        raise Exception(f"Failed to retrieve transcript: {error}") from error
+
+    monkeypatch.setattr(transcript_pipeline, "fetch_transcript", fetch)
+    result, payload = TranscriptPipeline().fetch("vid00000001")
+    assert payload is None
+    assert result["status"] == "error" and result["error"] == expected
+    if expected != "ConnectionError":
+        assert "unexpected" not in result["message"]
@@ -0,0 +1,68 @@
+"""ParagraphBuilder against the original join/sub/split implementation, and
+the NumPy pause boundaries against the pure-Python loop."""
+
+import random
+
+import pytest
+
+import transcript_text
+from benchmarks.bench_process_transcript import legacy_process_transcript, make_transcript
+from transcript_text import iter_paragraphs, process_transcript
+
+# Characters that exercise every branch: sentence breaks at snippet
+# boundaries, runs of spaces, timestamps split across snippets, empty text.
+ALPHABET = "ab .!?:1[]  "
+
+
+def random_transcript(rng, n):
+    return [
+        {"text": "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 8))), "start": i * 2.0, "duration": 2.0}
+        for i in range(n)
+    ]
+
+
+def test_builder_matches_legacy_on_random_text():
+    rng = random.Random(7)
+    for _ in range(3000):
+        transcript = random_transcript(rng, rng.randint(0, 12))
+        assert list(iter_paragraphs(transcript)) == legacy_process_transcript(transcript), transcript
+
+
+def test_builder_matches_legacy_on_long_transcript():
+    transcript = make_transcript(5000, seed=3)
+    assert process_transcript(transcript, "sentences") == legacy_process_transcript(transcript)
+
+
+@pytest.fixture
+def pure_python(monkeypatch):
+    monkeypatch.setattr(transcript_text, "_np", False)
+
+
+def _random_timings(rng, n):
+    starts, durations, lengths, t = [], [], [], 0.0
+    for _ in range(n):
+        t += rng.choice((0.0, 0.5, 1.0, 2.0, 2.5))  # 0.5 / 1.0 leave a gap, 2.0 overlaps or abuts
+        duration = rng.choice((0.5, 1.5, 2.0))
+        starts.append(t)
+        durations.append(duration)
+        lengths.append(rng.randint(1, 40))
+    return starts, durations, lengths
+
+
+def test_pause_boundaries_numpy_matches_pure_python(monkeypatch):
+    pytest.importorskip("numpy")
+    rng = random.Random(11)
+    cases = [_random_timings(rng, rng.randint(1, 60)) for _ in range(500)]
+    with_numpy = [transcript_text._pause_boundaries(*case, pause=1.0, max_chars=60) for case in cases]
+    monkeypatch.setattr(transcript_text, "_np", False)
+    without = [transcript_text._pause_boundaries(*case, pause=1.0, max_chars=60) for case in cases]
+    assert with_numpy == without
+
+
+def test_segment_by_pauses_breaks_at_pauses(pure_python):
+    transcript = [
+        {"text": "one", "start": 0.0, "duration": 1.0},
+        {"text": "two", "start": 1.0, "duration": 1.0},
+        {"text": "three", "start": 5.0, "duration": 1.0},
+    ]
+    assert transcript_text.segment_by_pauses(transcript, pause=1.5) == ["one two", "three"]
@@ -0,0 +1,139 @@
+"""Local archive of raw transcripts for offline re-rendering.
+
+The batch pipeline stores every fetched transcript here exactly as received
+(snippets with timestamps), together with the requested language, the
+resolved track and the video info it was rendered with.  Unlike the
+transcript cache nothing expires, so a change to paragraphing or templates
+can regenerate every output with ``batch_processing_yt.py --rerender`` and no
+network access.
+
+The archive is a single SQLite file, ``.yt2md-archive.sqlite3`` in the
+output directory, with snippets stored as zlib-compressed JSON.  A transcript
+that is archived again unchanged (a rerun, a sync, a cache hit) is recognised
+by its digest and not rewritten.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import run_metrics
+from transcript_render import render_chunk
+
+ARCHIVE_NAME = ".yt2md-archive.sqlite3"
+
+
+class TranscriptArchive:
+    """Append/replace store of raw transcripts keyed by video ID."""
+
+    def __init__(self, output_dir: str, path: Optional[str] = None, readonly: bool = False):
+        self.path = path or os.path.join(output_dir, ARCHIVE_NAME)
+        self._lock = threading.Lock()
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            return
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS transcripts (
+                   video_id TEXT PRIMARY KEY,
+                   language TEXT NOT NULL,
+                   track TEXT NOT NULL,
+                   info TEXT NOT NULL,
+                   data BLOB NOT NULL,
+                   fetched_at REAL NOT NULL,
+                   digest TEXT
+               )"""
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(transcripts)")]
+        if "digest" not in columns:  # archives written before digests were kept
+            self._conn.execute("ALTER TABLE transcripts ADD COLUMN digest TEXT")
+        self._conn.commit()
+
+    def put(self, video_id: str, language: str, track: str, info: dict, snippets: List[dict]) -> bool:
+        """Stores (or replaces) the raw transcript of *video_id*; returns False
+        when it was already archived with the same content."""
+        raw = json.dumps(snippets, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        info_json = json.dumps(info, ensure_ascii=False)
+        digest = hashlib.sha256("\0".join((language, track, info_json)).encode("utf-8") + b"\0" + raw).hexdigest()
+        with self._lock:
+            row = self._conn.execute("SELECT digest FROM transcripts WHERE video_id = ?", (video_id,)).fetchone()
+            if row is not None and row[0] == digest:
+                run_metrics.count("archive_unchanged")
+                return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (video_id, language, track, info_json, zlib.compress(raw), time.time(), digest),
+            )
+            self._conn.commit()
+        return True
+
+    def get(self, video_id: str) -> Optional[dict]:
+        """Returns ``{"video_id", "language", "track", "info", "snippets"}`` or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT language, track, info, data FROM transcripts WHERE video_id = ?",
+                (video_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        language, track, info, data = row
+        return {
+            "video_id": video_id,
+            "language": language,
+            "track": track,
+            "info": json.loads(info),
+            "snippets": json.loads(zlib.decompress(data)),
+        }
+
+    def video_ids(self) -> List[str]:
+        """All archived video IDs, in the order they were (last) archived."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT video_id FROM transcripts ORDER BY rowid")]
+
+    def fetch_times(self) -> Dict[str, float]:
+        """``{video_id: fetched_at}`` for every archived transcript."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT video_id, fetched_at FROM transcripts"))
+
+    def __iter__(self) -> Iterator[dict]:
+        for video_id in self.video_ids():
+            record = self.get(video_id)
+            if record is not None:
+                yield record
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def render_archived_chunk(archive_path: str, video_ids: Sequence[str], export_formats: Sequence[str],
+                          segment_mode: str = "auto") -> List[tuple]:
+    """Process-pool entry point for ``--rerender``.
+
+    Reads *video_ids* from the archive inside the worker (so raw snippets are
+    never shipped between processes) and returns, per video,
+    ``(video_id, info, rendered)`` with *rendered* as from ``render_chunk``.
+    """
+    archive = TranscriptArchive(os.path.dirname(archive_path), archive_path, readonly=True)
+    try:
+        records = [archive.get(video_id) for video_id in video_ids]
+    finally:
+        archive.close()
+    found = [record for record in records if record is not None]
+    rendered = iter(render_chunk([(r["info"], r["snippets"]) for r in found], export_formats, segment_mode))
+    return [
+        (video_id, record["info"], next(rendered)) if record is not None
+        else (video_id, None, ("error", "KeyError", "not in the transcript archive"))
+        for video_id, record in zip(video_ids, records)
+    ]
@@ -0,0 +1,319 @@
+"""Persistent on-disk caches for fetched transcripts and video metadata.
+
+Transcripts are stored as zlib-compressed JSON in a single SQLite database,
+keyed by (video_id, requested language, resolved track).  Entries expire after
+a TTL and the database is kept under a size budget by evicting the least
+recently used rows, so re-running a large batch costs disk reads instead of
+HTTP round trips.  Video metadata (title, author, thumbnail) and each
+video's caption track listing plus the track chosen for it (``TrackCache``)
+live in smaller TTL-only caches next to it.
+
+The location defaults to ``~/.cache/youtube-to-markdown`` and can be changed
+with the ``YT2MD_CACHE_DIR`` environment variable.  Setting ``YT2MD_NO_CACHE``
+disables both caches.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import List, Optional, Tuple
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "YT2MD_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "youtube-to-markdown"),
+)
+DEFAULT_TTL = 30 * 24 * 3600  # 30 days
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MiB of compressed transcripts
+DEFAULT_METADATA_TTL = 7 * 24 * 3600  # titles change rarely, but they do change
+DEFAULT_TRACKS_TTL = 7 * 24 * 3600  # captions get added (and removed) after upload
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class TranscriptCache:
+    """SQLite-backed transcript cache with TTL expiry and LRU eviction.
+
+    Safe to share between threads; separate processes may open the same file
+    because the database runs in WAL mode.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "transcripts.sqlite3")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = _connect(self.path)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS transcripts (
+                   video_id TEXT NOT NULL,
+                   language TEXT NOT NULL,
+                   track TEXT NOT NULL,
+                   data BLOB NOT NULL,
+                   size INTEGER NOT NULL,
+                   created_at REAL NOT NULL,
+                   accessed_at REAL NOT NULL,
+                   PRIMARY KEY (video_id, language, track)
+               )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS transcripts_accessed ON transcripts (accessed_at)"
+        )
+        self._conn.commit()
+        with self._lock:
+            self._purge_expired()
+            self._total = self._size()
+
+    def get(self, video_id: str, language: str) -> Optional[Tuple[List[dict], str]]:
+        """Returns ``(snippets, track)`` for a fresh entry, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT track, data, created_at FROM transcripts "
+                "WHERE video_id = ? AND language = ? ORDER BY created_at DESC LIMIT 1",
+                (video_id, language),
+            ).fetchone()
+            if row is None:
+                return None
+            track, data, created_at = row
+            if now - created_at > self.ttl:
+                self._conn.execute(
+                    "DELETE FROM transcripts WHERE video_id = ? AND language = ?",
+                    (video_id, language),
+                )
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE transcripts SET accessed_at = ? "
+                "WHERE video_id = ? AND language = ? AND track = ?",
+                (now, video_id, language, track),
+            )
+            self._conn.commit()
+        return json.loads(zlib.decompress(data)), track
+
+    def put(self, video_id: str, language: str, track: str, snippets: List[dict]):
+        """Stores raw transcript snippets for ``(video_id, language, track)``."""
+        data = zlib.compress(
+            json.dumps(snippets, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        )
+        now = time.time()
+        with self._lock:
+            # Replace whatever an earlier run resolved for this request.
+            self._conn.execute(
+                "DELETE FROM transcripts WHERE video_id = ? AND language = ?",
+                (video_id, language),
+            )
+            self._conn.execute(
+                "INSERT INTO transcripts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (video_id, language, track, data, len(data), now, now),
+            )
+            self._conn.commit()
+            self._total += len(data)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def clear(self):
+        """Removes every cached transcript."""
+        with self._lock:
+            self._conn.execute("DELETE FROM transcripts")
+            self._conn.commit()
+            self._total = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # -- internals (caller holds self._lock) ---------------------------------
+    def _size(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+
+    def _purge_expired(self):
+        self._conn.execute("DELETE FROM transcripts WHERE created_at < ?", (time.time() - self.ttl,))
+        self._conn.commit()
+
+    def _evict(self):
+        """Drops least recently used rows until the cache is at 90% of budget."""
+        self._purge_expired()
+        self._total = self._size()
+        target = int(self.max_bytes * 0.9)
+        if self._total <= target:
+            return
+        freed = 0
+        doomed = []
+        for rowid, size in self._conn.execute(
+            "SELECT rowid, size FROM transcripts ORDER BY accessed_at"
+        ):
+            doomed.append((rowid,))
+            freed += size
+            if self._total - freed <= target:
+                break
+        self._conn.executemany("DELETE FROM transcripts WHERE rowid = ?", doomed)
+        self._conn.commit()
+        self._total -= freed
+
+
+class MetadataCache:
+    """SQLite-backed cache of noembed/yt-dlp video metadata with TTL expiry."""
+
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_METADATA_TTL):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "metadata.sqlite3")
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = _connect(self.path)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS video_info (
+                   video_id TEXT PRIMARY KEY,
+                   data TEXT NOT NULL,
+                   created_at REAL NOT NULL
+               )"""
+        )
+        self._conn.execute("DELETE FROM video_info WHERE created_at < ?", (time.time() - self.ttl,))
+        self._conn.commit()
+
+    def get(self, video_id: str) -> Optional[dict]:
+        """Returns the cached info dict for *video_id*, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, created_at FROM video_info WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def put(self, video_id: str, info: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO video_info VALUES (?, ?, ?)",
+                (video_id, json.dumps(info, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TrackCache:
+    """SQLite-backed cache of caption track listings and the track each
+    preference policy chose, with TTL expiry (see ``transcript_helper``)."""
+
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_TRACKS_TTL):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "tracks.sqlite3")
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = _connect(self.path)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS tracks (
+                   video_id TEXT PRIMARY KEY,
+                   listing TEXT NOT NULL,
+                   choices TEXT NOT NULL,
+                   created_at REAL NOT NULL
+               )"""
+        )
+        self._conn.execute("DELETE FROM tracks WHERE created_at < ?", (time.time() - self.ttl,))
+        self._conn.commit()
+
+    def get(self, video_id: str) -> Optional[Tuple[List[dict], dict]]:
+        """Returns ``(listing, {policy key: track})`` for *video_id*, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT listing, choices, created_at FROM tracks WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        if row is None or time.time() - row[2] > self.ttl:
+            return None
+        return json.loads(row[0]), json.loads(row[1])
+
+    def put(self, video_id: str, listing: List[dict], choices: Optional[dict] = None):
+        """Stores a fresh listing; *choices* made against an older listing are dropped."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, ?)",
+                (video_id, json.dumps(listing, ensure_ascii=False), json.dumps(choices or {}), time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ---- process-wide defaults --------------------------------------------------
+_settings = {"enabled": not os.environ.get("YT2MD_NO_CACHE"), "refresh": False, "path": None}
+_default_cache: Optional[TranscriptCache] = None
+_default_metadata_cache: Optional[MetadataCache] = None
+_default_track_cache: Optional[TrackCache] = None
+_default_lock = threading.Lock()
+
+
+def configure(enabled: Optional[bool] = None, refresh: Optional[bool] = None,
+              path: Optional[str] = None):
+    """Adjusts the default caches used by the fetch helpers.
+
+    ``enabled=False`` bypasses the caches completely (``--no-cache``);
+    ``refresh=True`` skips lookups but still stores new results (``--refresh``).
+    ``path`` is the transcript database; metadata and track listings are
+    kept in the same directory.
+    """
+    global _default_cache, _default_metadata_cache, _default_track_cache
+    with _default_lock:
+        if enabled is not None:
+            _settings["enabled"] = enabled
+        if refresh is not None:
+            _settings["refresh"] = refresh
+        if path is not None and path != _settings["path"]:
+            _settings["path"] = path
+            _default_cache = None
+            _default_metadata_cache = None
+            _default_track_cache = None
+
+
+def get_default_cache() -> Optional[TranscriptCache]:
+    """Returns the shared cache, or None when caching is disabled."""
+    global _default_cache
+    if not _settings["enabled"]:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = TranscriptCache(_settings["path"])
+        return _default_cache
+
+
+def get_default_metadata_cache() -> Optional[MetadataCache]:
+    """Returns the shared metadata cache, or None when caching is disabled."""
+    global _default_metadata_cache
+    if not _settings["enabled"]:
+        return None
+    with _default_lock:
+        if _default_metadata_cache is None:
+            path = None
+            if _settings["path"]:
+                path = os.path.join(os.path.dirname(os.path.abspath(_settings["path"])), "metadata.sqlite3")
+            _default_metadata_cache = MetadataCache(path)
+        return _default_metadata_cache
+
+
+def get_default_track_cache() -> Optional[TrackCache]:
+    """Returns the shared track cache, or None when caching is disabled."""
+    global _default_track_cache
+    if not _settings["enabled"]:
+        return None
+    with _default_lock:
+        if _default_track_cache is None:
+            path = None
+            if _settings["path"]:
+                path = os.path.join(os.path.dirname(os.path.abspath(_settings["path"])), "tracks.sqlite3")
+            _default_track_cache = TrackCache(path)
+        return _default_track_cache
+
+
+def refresh_requested() -> bool:
+    return _settings["refresh"]
@@ -1,40 +1,242 @@
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Sequence, Tuple
 
-def get_transcript_with_fallback(video_id, target_language='en'):
-    """Attempts multiple methods to retrieve transcript with fallbacks."""
-    try:
-        # First try: Get transcript in target language
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-        
-        # Try to get manual transcript first
-        try:
-            transcript = transcript_list.find_manually_created_transcript([target_language])
-            return transcript.fetch()
-        except NoTranscriptFound:
-            pass
-            
-        # Try to get auto-generated transcript
-        try:
-            transcript = transcript_list.find_generated_transcript([target_language])
-            return transcript.fetch()
-        except NoTranscriptFound:
-            pass
-            
-        # Try to get any available transcript and translate it
+import rate_limit
+import run_metrics
+import transcript_cache
+
+TRACK_STEPS = ("manual", "generated", "translated", "any")
+LISTING_MEMO_SECONDS = 300  # a live listing is reused this long within one process
+LISTING_MEMO_SIZE = 64
+
+_live_listings = OrderedDict()
+_live_lock = threading.Lock()
+_api = None
+
+
+class TrackPolicy:
+    """Which caption track to fetch, as a declarative preference list.
+
+    *languages* is a priority list of language codes and *steps* the order in
+    which kinds of track are considered:
+
+    * ``manual`` / ``generated``: a track of that kind in each of *languages*,
+      in priority order;
+    * ``translated``: the first translatable track (manual ones first)
+      translated into ``languages[0]``;
+    * ``any``: the first track in whatever language there is.
+
+    Leaving a step out disables it, e.g. ``("manual",)`` only accepts
+    human-made captions.
+    """
+
+    def __init__(self, languages: Sequence[str] = ("en",), steps: Sequence[str] = TRACK_STEPS):
+        unknown = [step for step in steps if step not in TRACK_STEPS]
+        if unknown or not languages:
+            raise ValueError(f"invalid track policy: languages={list(languages)}, steps={list(steps)}")
+        self.languages = list(languages)
+        self.steps = list(steps)
+
+    @property
+    def key(self) -> str:
+        """Identifies the policy in the caches; the default steps add nothing,
+        so a plain language policy keeps the keys of earlier versions."""
+        key = ",".join(self.languages)
+        if tuple(self.steps) != TRACK_STEPS:
+            key += "|" + "+".join(self.steps)
+        return key
+
+    def candidates(self, transcript_list) -> List[Tuple[str, object]]:
+        """Every acceptable ``(track, Transcript)`` from one listing, best first."""
+        tracks = list(transcript_list)  # manual tracks first, then generated
+        by_kind = {(_kind(t), t.language_code): t for t in tracks}
+        target = self.languages[0]
+        found = []
+        for step in self.steps:
+            if step in ("manual", "generated"):
+                for code in self.languages:
+                    transcript = by_kind.get((step, code))
+                    if transcript is not None:
+                        found.append((f"{step}:{code}", transcript))
+            elif step == "translated":
+                for transcript in tracks:
+                    if transcript.is_translatable and target in _translation_codes(transcript):
+                        found.append((f"translated:{transcript.language_code}->{target}", transcript.translate(target)))
+                        break
+            elif tracks:
+                found.append((f"any:{tracks[0].language_code}", tracks[0]))
+        return found
+
+
+def _kind(transcript) -> str:
+    return "generated" if transcript.is_generated else "manual"
+
+
+def _translation_codes(transcript) -> List[str]:
+    return [
+        lang["language_code"] if isinstance(lang, dict) else lang.language_code
+        for lang in transcript.translation_languages
+    ]
+
+
+def _describe(transcript_list) -> List[dict]:
+    """The cacheable part of a listing: one dict per caption track."""
+    return [
+        {
+            "language_code": transcript.language_code,
+            "language": transcript.language,
+            "kind": _kind(transcript),
+            "translatable": transcript.is_translatable,
+        }
+        for transcript in transcript_list
+    ]
+
+
+def _to_raw_data(transcript):
+    """Normalizes a fetched transcript to a plain list of snippet dicts."""
+    if hasattr(transcript, "to_raw_data"):
+        return transcript.to_raw_data()
+    return list(transcript)
+
+
+def _timed_fetch(transcript):
+    with run_metrics.timed('transcript_fetch'):
+        return transcript.fetch()
+
+
+def _api_client():
+    """The shared ``YouTubeTranscriptApi`` instance (one HTTP session)."""
+    global _api
+    with _live_lock:
+        if _api is None:
+            # imported here so that cache hits never load the API client
+            from youtube_transcript_api import YouTubeTranscriptApi
+
+            _api = YouTubeTranscriptApi()
+        return _api
+
+
+def _live_listing(video_id):
+    """The API's track listing of *video_id*, requested at most once per
+    ``LISTING_MEMO_SECONDS`` so showing the languages and then fetching one
+    costs a single round trip."""
+    now = time.monotonic()
+    with _live_lock:
+        memo = _live_listings.get(video_id)
+        if memo is not None and now - memo[0] < LISTING_MEMO_SECONDS:
+            return memo[1]
+    with run_metrics.timed('list_transcripts'):
+        transcript_list = _api_client().list(video_id)
+    with _live_lock:
+        _live_listings[video_id] = (now, transcript_list)
+        while len(_live_listings) > LISTING_MEMO_SIZE:
+            _live_listings.popitem(last=False)
+    return transcript_list
+
+
+def list_tracks(video_id, track_cache=None, refresh=None) -> List[dict]:
+    """Describes every caption track of *video_id* (``language_code``,
+    ``language``, ``kind``, ``translatable``), from the track cache when it
+    has a fresh listing."""
+    if track_cache is None:
+        track_cache = transcript_cache.get_default_track_cache()
+    if refresh is None:
+        refresh = transcript_cache.refresh_requested()
+    cached = track_cache.get(video_id) if track_cache is not None and not refresh else None
+    if cached is not None:
+        run_metrics.count('track_cache_hits')
+        return cached[0]
+    listing = _describe(rate_limit.limiter_for('youtube').call(_live_listing, video_id))
+    if track_cache is not None:
+        previous = track_cache.get(video_id)
+        track_cache.put(video_id, listing, previous[1] if previous and previous[0] == listing else None)
+    return listing
+
+
+def resolve_track(video_id, policy: TrackPolicy, track_cache=None, refresh=False):
+    """Lists the tracks of *video_id* once and fetches the best one for *policy*.
+
+    When the track cache remembers which track *policy* chose last time (and
+    the listing has not changed since), that track is fetched first; the
+    API still needs the listing to know the caption URL, but nothing else is
+    tried.  With *refresh* the remembered choice is ignored and replaced.
+    A failed translation falls through to the next candidate; any other
+    fetch error is raised.
+
+    Returns ``(fetched transcript, track, listing)`` with *listing* as from
+    ``list_tracks``.
+    """
+    from youtube_transcript_api import NoTranscriptFound
+
+    transcript_list = _live_listing(video_id)
+    listing = _describe(transcript_list)
+    cached = track_cache.get(video_id) if track_cache is not None else None
+    choices = cached[1] if cached is not None and cached[0] == listing else {}
+
+    candidates = policy.candidates(transcript_list)
+    chosen = None if refresh else choices.get(policy.key)
+    if chosen is not None:
+        run_metrics.count('track_choice_hits')
+        candidates.sort(key=lambda candidate: candidate[0] != chosen)
+
+    for track, transcript in candidates:
         try:
-            transcript = transcript_list.find_transcript(transcript_list.transcript_data.keys())
-            translated = transcript.translate(target_language)
-            return translated.fetch()
-        except Exception:
-            pass
-            
-        # Final attempt: Get any available transcript
-        available_transcripts = list(transcript_list.transcript_data.keys())
-        if available_transcripts:
-            transcript = transcript_list.find_transcript([available_transcripts[0]])
-            return transcript.fetch()
-            
-        raise NoTranscriptFound(f'No transcript found for video {video_id}')
-        
+            fetched = _timed_fetch(transcript)
+        except Exception as e:
+            if track.startswith('translated:') and not rate_limit.is_throttled(e):
+                continue
+            raise
+        if track_cache is not None and chosen != track:
+            choices[policy.key] = track
+            track_cache.put(video_id, listing, choices)
+        return fetched, track, listing
+
+    raise NoTranscriptFound(video_id, policy.languages, transcript_list)
+
+
+def fetch_transcript(video_id, target_language='en', cache=None, refresh=None, steps=TRACK_STEPS):
+    """Like ``get_transcript_with_fallback`` but returns ``(snippets, track)``,
+    where *track* names the transcript that was resolved, e.g. "manual:en"
+    or "translated:de->en".
+
+    *target_language* may be a comma-separated priority list ("en,en-GB")
+    and *steps* reorders or restricts the kinds of track accepted; see
+    ``TrackPolicy``."""
+    policy = TrackPolicy([code.strip() for code in target_language.split(',') if code.strip()], steps)
+    if cache is None:
+        cache = transcript_cache.get_default_cache()
+    if refresh is None:
+        refresh = transcript_cache.refresh_requested()
+
+    if cache is not None and not refresh:
+        hit = cache.get(video_id, policy.key)
+        if hit is not None:
+            run_metrics.count('transcript_cache_hits')
+            return hit
+        run_metrics.count('transcript_cache_misses')
+
+    try:
+        fetched, track, _ = rate_limit.limiter_for('youtube').call(
+            resolve_track, video_id, policy, transcript_cache.get_default_track_cache(), refresh
+        )
+        snippets = _to_raw_data(fetched)
     except Exception as e:
-        raise Exception(f'Failed to retrieve transcript: {str(e)}')
\ No newline at end of file
+        raise Exception(f'Failed to retrieve transcript: {str(e)}') from e
+
+    run_metrics.count(f"tracks_{track.split(':', 1)[0]}")
+    if cache is not None:
+        cache.put(video_id, policy.key, track, snippets)
+    return snippets, track
+
+
+def get_transcript_with_fallback(video_id, target_language='en', cache=None, refresh=None):
+    """Attempts multiple methods to retrieve transcript with fallbacks.
+
+    Results are served from and stored in the persistent transcript cache
+    (see ``transcript_cache``) unless caching is disabled.  ``refresh=True``
+    forces a network fetch and overwrites the cached copy.  Returns a list of
+    raw snippet dicts (``text``, ``start``, ``duration``).
+    """
+    return fetch_transcript(video_id, target_language, cache, refresh)[0]
@@ -0,0 +1,461 @@
+"""Shared transcript pipeline behind every entry point.
+
+The batch CLI, the interactive CLI, the Streamlit app and its background
+batch jobs used to carry their own copies of video ID parsing, metadata
+lookups, paragraphing and filename handling.  They now all go through this
+module, and through ``TranscriptPipeline`` in particular, so a speed-up
+lands everywhere at once:
+
+* video IDs, filenames and playlist/channel expansion (yt-dlp, lazily paged);
+* ``TranscriptPipeline``: one configured pipeline (language, formats,
+  segmentation, concurrency) that fetches through the shared caches, rate
+  limits and pooled HTTP session, and renders with ``transcript_render``.
+  ``run()`` streams a whole batch through the download thread pool and the
+  optional render process pool, in input order.
+
+Writing results (files, a zip, the browser) is left to the caller.
+"""
+
+import itertools
+import queue
+import re
+import threading
+import unicodedata
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Container, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import rate_limit
+import run_metrics
+from search_index import SearchIndex
+from transcript_archive import TranscriptArchive
+from transcript_helper import TRACK_STEPS, fetch_transcript, list_tracks
+from transcript_render import render, render_chunk
+from transcript_segments import SegmentStore
+from transcript_text import process_transcript
+from video_metadata import get_video_info, info_from_playlist_entry, remember_video_info
+
+# yt_dlp and youtube_transcript_api are imported where they are needed: they
+# dominate start-up time, and a single cached video needs neither.
+
+
+# File systems cap a name at 255 bytes; leave room for the extension, the
+# "_<video ID>" suffix OutputStore adds on a collision and its temp-file suffix.
+MAX_FILENAME_BYTES = 200
+
+
+def sanitize_filename(title: str) -> str:
+    """Sanitizes a string to be a valid filename of at most ``MAX_FILENAME_BYTES``
+    UTF-8 bytes."""
+    s = re.sub(r'[\\/*?:"<>|]', "", title)
+    s = s.replace(" ", "_")
+    return s.encode("utf-8")[:MAX_FILENAME_BYTES].decode("utf-8", "ignore")
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """Extracts the video ID from a YouTube URL, or returns None."""
+    if re.match(r'^[a-zA-Z0-9_-]{11}$', url):
+        return url
+
+    regex_patterns = [
+        r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
+        r'(?:https?://)?(?:www\.)?youtu\.be/([a-zA-Z0-9_-]{11})',
+        r'(?:https?://)?(?:www\.)?youtube\.com/embed/([a-zA-Z0-9_-]{11})',
+        r'(?:https?://)?(?:www\.)?youtube\.com/v/([a-zA-Z0-9_-]{11})'
+    ]
+
+    for pattern in regex_patterns:
+        match = re.match(pattern, url)
+        if match:
+            return match.group(1)
+    return None
+
+
+COLLECTION_URL_RE = re.compile(
+    r'(?:https?://)?(?:www\.|m\.)?youtube\.com/(?:playlist\?|@[^/?#]+|channel/|c/|user/)', re.IGNORECASE
+)
+
+
+def is_collection_url(url: str) -> bool:
+    """True for playlist and channel URLs (expanded with yt-dlp into their
+    videos), false for single videos and anything else."""
+    return extract_video_id(url) is None and COLLECTION_URL_RE.match(url.strip()) is not None
+
+
+def kebab_filename(title: str) -> str:
+    """Return a safe, predictable filename (the interactive CLI's style).
+
+    • ASCII‑only (strip accents / symbols)
+    • lower‑case kebab‑case
+    • max 100 chars
+    • keeps dots so you can append an extension later
+    """
+    # Normalize & transliterate to ASCII
+    slug = (
+        unicodedata.normalize("NFKD", title)
+        .encode("ascii", "ignore")
+        .decode("ascii")
+    )
+    # Replace ampersands with 'and'
+    slug = slug.replace("&", "and")
+    # Turn whitespace into single dashes
+    slug = re.sub(r"\s+", "-", slug)
+    # Remove anything not alphanum, dash, underscore or dot
+    slug = re.sub(r"[^0-9A-Za-z._-]", "", slug)
+    # Collapse multiple dashes
+    slug = re.sub(r"-{2,}", "-", slug)
+    # Trim leading/trailing punctuation
+    slug = slug.strip("-_.").lower()
+    return slug[:100]  # 100 chars is plenty
+
+
+
+def _iter_paged(entries) -> Iterator[dict]:
+    """Iterates yt-dlp entries one page at a time, however they are wrapped.
+    Each page request counts against the "youtube" rate limit."""
+    import yt_dlp
+
+    if isinstance(entries, yt_dlp.utils.PagedList):
+        youtube = rate_limit.limiter_for('youtube')
+        for pagenum in itertools.count():
+            with run_metrics.timed('playlist_page'):
+                page = youtube.call(entries.getpage, pagenum)
+            if not page:
+                return
+            yield from page
+    else:
+        yield from entries
+
+
+def iter_playlist_entries(playlist_url: str, limit: Optional[int] = None,
+                          finished_tabs: Optional[Container[str]] = None) -> Iterator[dict]:
+    """Lazily yields video entries from a YouTube playlist or channel using yt-dlp.
+
+    Each entry is yt-dlp's flat record (``id``, ``title``, ``channel``,
+    ``uploader``, ...) with the playlist's channel filled in when missing, so
+    the batch pipeline can use it instead of a per-video noembed request.
+    Pages are requested only as the caller consumes entries, so downloads can
+    start before the whole playlist is known.  There is no built-in cap;
+    ``limit`` stops after that many videos.
+
+    Every entry records the page it was listed on as ``tab`` (a channel's
+    Videos, Live or Shorts tab, or the playlist itself).  Once the caller
+    adds that URL to *finished_tabs*, the rest of the tab is skipped and
+    listing continues with the next one.
+    """
+    import yt_dlp
+
+    ydl_opts = {
+        'quiet': True,
+        'extract_flat': True,
+    }
+    yielded = 0
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            pending = [playlist_url]
+            while pending:
+                tab = pending.pop(0)
+                with run_metrics.timed('playlist_page'):
+                    result = rate_limit.limiter_for('youtube').call(
+                        ydl.extract_info, tab, download=False, process=False
+                    )
+                if result.get('_type') in ('url', 'url_transparent'):
+                    pending.insert(0, result['url'])
+                    continue
+                for entry in _iter_paged(result.get('entries') or []):
+                    if not entry:
+                        continue
+                    if entry.get('ie_key') == 'YoutubeTab':
+                        # Channel pages list their tabs (Videos, Live, ...) as nested playlists.
+                        pending.append(entry['url'])
+                        continue
+                    if not (entry.get('channel') or entry.get('uploader')):
+                        entry['channel'] = result.get('channel') or result.get('uploader')
+                    entry['tab'] = tab
+                    yield entry
+                    yielded += 1
+                    if limit is not None and yielded >= limit:
+                        return
+                    if finished_tabs is not None and tab in finished_tabs:
+                        break
+    except yt_dlp.utils.DownloadError as e:
+        print(f"Error extracting playlist: {e}")
+    except Exception as e:
+        print(f"An unexpected error occurred while extracting playlist: {e}")
+
+
+def get_playlist_entries(playlist_url: str, limit: Optional[int] = None) -> List[dict]:
+    """Extracts all video entries from a YouTube playlist using yt-dlp."""
+    return list(iter_playlist_entries(playlist_url, limit))
+
+
+def get_playlist_video_ids(playlist_url: str) -> List[str]:
+    """Extracts video IDs from a YouTube playlist using yt-dlp."""
+    return [entry['id'] for entry in get_playlist_entries(playlist_url)]
+
+
+def _resolve_video_info(video_id: str, entry: Optional[dict]) -> dict:
+    """Uses playlist metadata when yt-dlp provided it; noembed otherwise."""
+    if entry is not None:
+        info = info_from_playlist_entry(entry)
+        if info is not None:
+            remember_video_info(video_id, info)
+            return info
+    return get_video_info(video_id)
+
+
+def new_result(video_id: str) -> dict:
+    """Per-video result dict with ``video_id``, ``status`` ("ok" or "error"),
+    ``paths``, ``error`` (exception class name), ``track`` (the caption track
+    used, e.g. "manual:en") and ``message``."""
+    return {"video_id": video_id, "status": "ok", "paths": [], "error": None, "track": None, "message": ""}
+
+
+def mark_failed(result: dict, error: str, message: str):
+    result["status"] = "error"
+    result["error"] = error
+    result["message"] = message
+    run_metrics.failure(error)
+
+
+def _expand_inputs(videos: Iterable[Union[str, dict]], limit: Optional[int] = None) -> Iterator[dict]:
+    """Yields playlist-style entries, lazily expanding any playlist or channel
+    links passed from a file.  Plain video IDs become ``{"id": video_id}``."""
+    for video in videos:
+        if isinstance(video, dict):
+            yield video
+        elif not is_collection_url(video):
+            yield {"id": video}
+        else:
+            yield from iter_playlist_entries(video, limit)
+
+
+_END = object()
+PREFETCH_POLL_SECONDS = 0.5
+
+
+def _prefetch(items: Iterable[dict], size: int) -> Iterator[dict]:
+    """Consumes *items* on a background thread, buffering up to *size* ahead.
+
+    Lets playlist expansion fetch later pages while the worker pool is still
+    busy with the first entries.  Closing the generator early (a cancelled
+    job) stops the thread and closes *items*, ending the expansion.
+    """
+    buffer = queue.Queue(maxsize=size)
+    stop = threading.Event()
+    failure = []
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=PREFETCH_POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not put(item):
+                    break
+        except BaseException as exc:  # re-raised in the consumer
+            failure.append(exc)
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+            put(_END)
+
+    threading.Thread(target=produce, name="playlist-expander", daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                break
+            yield item
+    finally:
+        stop.set()
+    if failure:
+        raise failure[0]
+
+
+def _ordered_pool_map(fn: Callable[[dict], tuple], items: Iterable[dict], workers: int) -> Iterator[tuple]:
+    """Yields ``fn(item)`` for every item in input order using a thread pool.
+
+    At most ``2 * workers`` calls are in flight at once, so the input can be a
+    lazy iterator of any length without queueing the whole batch up front.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for item in items:
+            in_flight.append(pool.submit(fn, item))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+class TranscriptPipeline:
+    """A configured transcript pipeline: what to fetch, how to render it and
+    how much concurrency to use.
+
+    The expensive shared state lives in the modules it calls, so every
+    pipeline in a process shares it: the pooled HTTP session
+    (``video_metadata``), the per-host rate limits (``rate_limit``) and the
+    on-disk transcript and metadata caches (``transcript_cache``).
+    """
+
+    def __init__(self, language: str = "en", export_formats: Sequence[str] = ("txt",),
+                 segment_mode: str = "auto", workers: int = 1, render_processes: int = 0,
+                 archive: Optional[TranscriptArchive] = None, index: Optional[SearchIndex] = None,
+                 tracks: Sequence[str] = TRACK_STEPS):
+        self.language = language
+        self.export_formats = list(export_formats)
+        self.segment_mode = segment_mode
+        self.workers = workers
+        self.render_processes = render_processes
+        self.archive = archive
+        self.index = index
+        self.tracks = tuple(tracks)
+
+    # -- single video ----------------------------------------------------------
+    def video_info(self, video_id: str, entry: Optional[dict] = None) -> dict:
+        """Title, author and thumbnail; from *entry* (a yt-dlp playlist record)
+        when it has them, otherwise from the metadata cache or noembed."""
+        return _resolve_video_info(video_id, entry)
+
+    def languages(self, video_id: str) -> List[str]:
+        """Language codes of every caption track of *video_id*.  The listing
+        is cached and reused by the fetch that usually follows."""
+        return [track["language_code"] for track in list_tracks(video_id)]
+
+    def snippets(self, video_id: str, language: Optional[str] = None) -> List[dict]:
+        """Raw snippet dicts, through the transcript cache and track policy."""
+        return fetch_transcript(video_id, language or self.language, steps=self.tracks)[0]
+
+    def paragraphs(self, segments: SegmentStore) -> List[str]:
+        """Paragraphs of an already fetched transcript, in ``segment_mode``."""
+        return process_transcript(segments, self.segment_mode)
+
+    def transcript(self, video_id: str, language: Optional[str] = None) -> Tuple[SegmentStore, List[str]]:
+        """The timed transcript and its paragraphs."""
+        segments = SegmentStore.from_snippets(self.snippets(video_id, language))
+        return segments, self.paragraphs(segments)
+
+    def render(self, fmt: str, info: dict, paragraphs: List[str], segments: SegmentStore) -> str:
+        """Renders one format; see ``transcript_render.render``."""
+        return render(fmt, info, paragraphs, segments)
+
+    # -- batch stages ----------------------------------------------------------
+    def fetch(self, video_id: str, entry: Optional[dict] = None) -> Tuple[dict, Optional[tuple]]:
+        """Network stage: fetches the transcript and video info of one video.
+
+        Returns ``(result, payload)`` where *payload* is ``(video_info, snippets)``,
+        or None when the fetch failed (the reason is recorded in *result*).
+        ``entry`` is an optional yt-dlp playlist record whose title and channel
+        are used in place of a noembed lookup; an entry with ``"refresh": True``
+        bypasses the transcript and track caches.  The raw snippets are stored in
+        the pipeline's archive, when it has one, for later offline re-rendering,
+        and added to its search index, when it has one.
+        """
+        result = new_result(video_id)
+        try:
+            refresh = entry.get("refresh") if entry is not None else None
+            snippets, track = fetch_transcript(video_id, self.language, refresh=refresh, steps=self.tracks)
+            result["track"] = track
+            video_info = _resolve_video_info(video_id, entry)
+            if self.archive is not None:
+                self.archive.put(video_id, self.language, track, video_info, snippets)
+            if self.index is not None:
+                self.index.add(video_id, video_info, snippets)
+            return result, (video_info, snippets)
+
+        except Exception as e:
+            from youtube_transcript_api import NoTranscriptFound, TranscriptsDisabled, VideoUnavailable
+
+            cause = e.__cause__ or e  # fetch_transcript wraps every error
+            if isinstance(cause, VideoUnavailable):
+                mark_failed(result, "VideoUnavailable", f"❌ Video {video_id} is unavailable.")
+            elif isinstance(cause, TranscriptsDisabled):
+                mark_failed(result, "TranscriptsDisabled", f"❌ Transcripts are disabled for video {video_id}.")
+            elif isinstance(cause, NoTranscriptFound):
+                mark_failed(result, "NoTranscriptFound", f"❌ No transcripts found for the selected language for video {video_id}.")
+            else:
+                mark_failed(result, type(cause).__name__, f"❌ An unexpected error occurred for video {video_id}: {e}")
+        return result, None
+
+    def process(self, video_id: str, entry: Optional[dict] = None) -> tuple:
+        """Fetch stage plus inline rendering; returns ``(result, video_info, rendered)``
+        with *rendered* as from ``render_chunk``, or None when the fetch failed."""
+        result, payload = self.fetch(video_id, entry)
+        if payload is None:
+            return result, None, None
+        return result, payload[0], render_chunk([payload], self.export_formats, self.segment_mode)[0]
+
+    def _render_stage(self, fetched: Iterable[Tuple[dict, Optional[tuple]]], chunk_size: int = 8) -> Iterator[tuple]:
+        """Renders the output of ``fetch`` on ``render_processes`` processes.
+
+        Fetched transcripts are shipped to the pool in chunks of *chunk_size* so
+        segmentation and formatting run outside the GIL while the fetch threads
+        keep downloading.  At most ``2 * render_processes`` chunks are in flight.
+        Yields ``(result, video_info, rendered)`` in input order, like
+        ``process``; failed fetches pass through without a round trip.
+        """
+        def submit(batch: list):
+            tasks = [payload for _, payload in batch if payload is not None]
+            future = pool.submit(render_chunk, tasks, self.export_formats, self.segment_mode) if tasks else None
+            in_flight.append((batch, future))
+
+        def collect() -> Iterator[tuple]:
+            batch, future = in_flight.popleft()
+            rendered = iter(future.result() if future is not None else ())
+            for result, payload in batch:
+                if payload is None:
+                    yield result, None, None
+                else:
+                    yield result, payload[0], next(rendered)
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=self.render_processes) as pool:
+            in_flight = deque()
+            batch = []
+            for item in fetched:
+                batch.append(item)
+                if len(batch) >= chunk_size:
+                    submit(batch)
+                    batch = []
+                    if len(in_flight) >= 2 * self.render_processes:
+                        yield from collect()
+            if batch:
+                submit(batch)
+            while in_flight:
+                yield from collect()
+
+    def run(self, videos: Iterable[Union[str, dict]], limit: Optional[int] = None,
+            skip: Optional[Callable[[dict], bool]] = None) -> Iterator[tuple]:
+        """Streams a batch through the pipeline.
+
+        *videos* may mix video IDs, playlist/channel URLs (expanded lazily, at
+        most *limit* videos each) and yt-dlp playlist entries, and may itself
+        be lazy.  Entries for which ``skip(entry)`` is true are dropped.
+        Yields ``(result, video_info, rendered)`` like ``process``, in input
+        order whatever the number of ``workers``; with ``render_processes``
+        rendering runs in that many processes instead of the fetch threads.
+        """
+        step = self.fetch if self.render_processes else self.process
+
+        def call(entry: dict) -> tuple:
+            return step(entry["id"], entry)
+
+        entries = _expand_inputs(videos, limit)
+        if skip is not None:
+            entries = (entry for entry in entries if not skip(entry))
+        if self.workers > 1:
+            outcomes = _ordered_pool_map(call, _prefetch(entries, 4 * self.workers), self.workers)
+        else:
+            outcomes = map(call, entries)
+        if self.render_processes:
+            outcomes = self._render_stage(outcomes)
+        yield from outcomes
@@ -0,0 +1,120 @@
+"""Output renderers shared by the CLIs and the Streamlit app.
+
+A transcript is fetched and segmented once; every requested format is then
+rendered from the same in-memory result (video info, paragraphs and the
+timed ``SegmentStore``).  Text formats use the paragraphs, the timed formats
+(SRT, WebVTT) use the real snippet timestamps.
+
+``render_all`` and ``render_chunk`` bundle segmentation plus rendering into
+one pure CPU step, so the batch pipeline can run it in a process pool and
+stream the rendered text back to a single writer.
+"""
+
+import json
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from transcript_segments import SegmentStore
+from transcript_text import process_transcript
+
+# extension -> display name, in menu order
+FORMATS = {
+    "md": "Markdown",
+    "txt": "Plain Text",
+    "json": "JSON",
+    "srt": "SRT",
+    "vtt": "WebVTT",
+}
+FORMAT_EXTENSIONS = {name: ext for ext, name in FORMATS.items()}
+MIME_TYPES = {
+    "md": "text/markdown",
+    "txt": "text/plain",
+    "json": "application/json",
+    "srt": "application/x-subrip",
+    "vtt": "text/vtt",
+}
+
+
+def _clock(seconds: float, decimal_mark: str) -> str:
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{decimal_mark}{millis:03d}"
+
+
+def render_markdown(info: dict, paragraphs: List[str], segments: SegmentStore) -> str:
+    return f"# {info['title']}\n\n" + "\n\n".join(paragraphs)
+
+
+def render_text(info: dict, paragraphs: List[str], segments: SegmentStore) -> str:
+    return f"{info['title']}\n\n" + "\n\n".join(paragraphs)
+
+
+def render_json(info: dict, paragraphs: List[str], segments: SegmentStore) -> str:
+    return json.dumps({
+        "title": info['title'],
+        "author": info['author_name'],
+        "paragraphs": paragraphs
+    }, indent=2, ensure_ascii=False)
+
+
+def render_srt(info: dict, paragraphs: List[str], segments: SegmentStore) -> str:
+    blocks = []
+    for i, (text, start, duration) in enumerate(segments, 1):
+        blocks.append(f"{i}\n{_clock(start, ',')} --> {_clock(start + duration, ',')}\n{text}\n")
+    return "\n".join(blocks)
+
+
+def render_vtt(info: dict, paragraphs: List[str], segments: SegmentStore) -> str:
+    blocks = ["WEBVTT\n"]
+    for text, start, duration in segments:
+        blocks.append(f"{_clock(start, '.')} --> {_clock(start + duration, '.')}\n{text}\n")
+    return "\n".join(blocks)
+
+
+RENDERERS: Dict[str, Callable[[dict, List[str], SegmentStore], str]] = {
+    "md": render_markdown,
+    "txt": render_text,
+    "json": render_json,
+    "srt": render_srt,
+    "vtt": render_vtt,
+}
+
+
+def render(fmt: str, info: dict, paragraphs: List[str], segments: SegmentStore) -> str:
+    """Renders one format (an extension such as "md" or a display name such as
+    "Markdown") from an already fetched and segmented transcript."""
+    ext = FORMAT_EXTENSIONS.get(fmt, fmt)
+    return RENDERERS[ext](info, paragraphs, segments)
+
+
+def render_all(video_info: dict, snippets, export_formats: Sequence[str],
+               segment_mode: str = "auto") -> List[Tuple[str, str]]:
+    """Segments *snippets* once and renders every format in *export_formats*.
+
+    Returns ``[(extension, content), ...]`` in the requested order.
+    """
+    transcript = SegmentStore.from_snippets(snippets)
+    paragraphs = process_transcript(transcript, segment_mode)
+    return [(ext, render(ext, video_info, paragraphs, transcript)) for ext in export_formats]
+
+
+def render_chunk(tasks: Sequence[Tuple[dict, list]], export_formats: Sequence[str],
+                 segment_mode: str = "auto") -> List[tuple]:
+    """Process-pool entry point: renders a chunk of ``(video_info, snippets)``.
+
+    Returns one item per task, either ``("ok", outputs, seconds)`` with
+    *outputs* as from ``render_all`` and the time it took, or ``("error",
+    exception class name, message)``, so one bad transcript does not fail the
+    whole chunk.
+    """
+    rendered = []
+    for video_info, snippets in tasks:
+        start = time.perf_counter()
+        try:
+            outputs = render_all(video_info, snippets, export_formats, segment_mode)
+            rendered.append(("ok", outputs, time.perf_counter() - start))
+        except Exception as e:
+            rendered.append(("error", type(e).__name__, str(e)))
+    return rendered
@@ -0,0 +1,128 @@
+"""Compact, array-backed transcript representation.
+
+A fetched transcript is a list of dicts (or ``FetchedTranscriptSnippet``
+objects): several hundred bytes of Python objects per caption line.
+``SegmentStore`` keeps the same data in three parallel typed arrays (start,
+duration, text offset) plus one shared text buffer, roughly 20 bytes of
+overhead per snippet, and supports O(log n) lookups in both directions:
+
+* time -> snippet index / text       (``index_at_time``, ``text_at_time``)
+* text offset -> snippet index / time (``index_at_offset``, ``time_at_offset``)
+
+Text offsets refer to ``store.text``, the snippet texts joined by single
+spaces, i.e. the transcript as one string.
+"""
+
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from collections.abc import Sequence
+from typing import Iterable, Iterator, List
+
+Segment = namedtuple("Segment", "text start duration")
+
+SEPARATOR = " "
+
+
+def timestamp_url(video_id: str, seconds: float) -> str:
+    """Returns a ``youtube.com/watch`` link that starts playback at *seconds*."""
+    return f"https://www.youtube.com/watch?v={video_id}&t={int(seconds)}s"
+
+
+class SegmentStore(Sequence):
+    """Immutable transcript stored as parallel arrays and one text buffer.
+
+    Iterating yields ``Segment(text, start, duration)`` tuples, so a store can
+    be passed anywhere a list of snippets is accepted.
+    """
+
+    __slots__ = ("starts", "durations", "offsets", "text")
+
+    def __init__(self, starts: array, durations: array, offsets: array, text: str):
+        self.starts = starts        # array('d'), seconds
+        self.durations = durations  # array('d'), seconds
+        self.offsets = offsets      # array('I'), len(self) + 1 entries into self.text
+        self.text = text
+
+    @classmethod
+    def from_snippets(cls, snippets: Iterable) -> "SegmentStore":
+        """Builds a store from snippet dicts, snippet objects or another store."""
+        if isinstance(snippets, cls):
+            return snippets
+        starts = array("d")
+        durations = array("d")
+        offsets = array("I")
+        texts: List[str] = []
+        position = 0
+        for snippet in snippets:
+            if isinstance(snippet, dict):
+                text = snippet.get("text", "")
+                starts.append(snippet.get("start", 0.0))
+                durations.append(snippet.get("duration", 0.0))
+            else:
+                text = getattr(snippet, "text", "")
+                starts.append(getattr(snippet, "start", 0.0))
+                durations.append(getattr(snippet, "duration", 0.0))
+            if texts:
+                position += len(SEPARATOR)
+            offsets.append(position)
+            texts.append(text)
+            position += len(text)
+        offsets.append(position)  # end of the buffer
+        return cls(starts, durations, offsets, SEPARATOR.join(texts))
+
+    # -- sequence protocol -------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Segment:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return Segment(self.text_of(index), self.starts[index], self.durations[index])
+
+    def __iter__(self) -> Iterator[Segment]:
+        for i in range(len(self)):
+            yield Segment(self.text_of(i), self.starts[i], self.durations[i])
+
+    def text_of(self, index: int) -> str:
+        """Text of snippet *index* (a slice of the shared buffer)."""
+        end = self.offsets[index + 1]
+        if index + 1 < len(self):
+            end -= len(SEPARATOR)
+        return self.text[self.offsets[index]:end]
+
+    # -- lookups -------------------------------------------------------------
+    def index_at_time(self, seconds: float) -> int:
+        """Index of the snippet being spoken at *seconds* (the last one that
+        started at or before it); 0 for times before the first snippet."""
+        return max(bisect_right(self.starts, seconds) - 1, 0)
+
+    def text_at_time(self, seconds: float) -> str:
+        return self.text_of(self.index_at_time(seconds)) if len(self) else ""
+
+    def index_at_offset(self, offset: int) -> int:
+        """Index of the snippet containing character *offset* of ``self.text``."""
+        return max(bisect_right(self.offsets, offset, 0, len(self)) - 1, 0)
+
+    def time_at_offset(self, offset: int) -> float:
+        return self.starts[self.index_at_offset(offset)] if len(self) else 0.0
+
+    # -- conversion ----------------------------------------------------------
+    def to_raw_data(self) -> List[dict]:
+        """Returns the transcript as plain snippet dicts."""
+        return [
+            {"text": self.text_of(i), "start": self.starts[i], "duration": self.durations[i]}
+            for i in range(len(self))
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate payload size: the arrays plus the text buffer."""
+        return (
+            self.starts.itemsize * len(self.starts)
+            + self.durations.itemsize * len(self.durations)
+            + self.offsets.itemsize * len(self.offsets)
+            + len(self.text.encode("utf-8"))
+        )
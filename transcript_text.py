@@ -0,0 +1,255 @@
+"""Transcript text processing shared by the CLIs and the Streamlit app.
+
+``process_transcript`` used to join the whole transcript into one string and
+run uncompiled ``re.sub``/``re.split`` passes over it, holding several copies
+of a multi-megabyte string for long livestreams.  ``ParagraphBuilder``
+produces exactly the same paragraphs while consuming snippets one at a time,
+so peak memory is proportional to the paragraph being built.
+
+Auto-generated captions usually carry no ``.!?`` at all, which turns the
+sentence split into one giant paragraph.  ``segment_by_pauses`` instead
+breaks paragraphs at speech pauses (gaps between snippet timings) and at a
+length limit, computed in one vectorized pass when NumPy is installed and an
+equivalent linear loop otherwise.  ``process_transcript`` picks between the
+two automatically.
+"""
+
+import re
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from transcript_segments import SegmentStore
+
+TIMESTAMP_RE = re.compile(r"\[?[0-9]+:[0-9]+\]?")
+SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?]) +")
+SENTENCES_PER_PARAGRAPH = 3
+
+PAUSE_SECONDS = 2.0          # silence that starts a new paragraph
+MAX_PARAGRAPH_CHARS = 600    # soft cap on pause-segmented paragraph length
+MIN_SENTENCE_DENSITY = 0.05  # sentence ends per snippet below which captions count as unpunctuated
+_np = None  # numpy, or False when it is not installed
+
+
+def _numpy():
+    """numpy, imported on first use: it is optional and slow to import."""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:  # optional: segment_by_pauses falls back to pure Python
+            _np = False
+    return _np or None
+
+
+SEGMENT_MODES = ("auto", "sentences", "pauses")
+
+
+def snippet_text(snippet) -> str:
+    """Returns the text of a snippet dict or ``FetchedTranscriptSnippet``."""
+    if isinstance(snippet, dict):
+        return snippet.get("text", "")
+    return getattr(snippet, "text", "")
+
+
+def snippet_timing(snippet) -> Tuple[float, float]:
+    """Returns ``(start, duration)`` of a snippet dict or object."""
+    if isinstance(snippet, dict):
+        return snippet.get("start", 0.0), snippet.get("duration", 0.0)
+    return getattr(snippet, "start", 0.0), getattr(snippet, "duration", 0.0)
+
+
+class ParagraphBuilder:
+    """Incrementally groups transcript text into paragraphs of N sentences.
+
+    Equivalent to joining every snippet with a space, stripping ``[mm:ss]``
+    timestamps, splitting on whitespace after ``.!?`` and grouping the
+    sentences, but without materialising the joined text.
+    """
+
+    def __init__(self, sentences_per_paragraph: int = SENTENCES_PER_PARAGRAPH):
+        self.sentences_per_paragraph = sentences_per_paragraph
+        self._parts: List[str] = []       # text of the sentence being built
+        self._sentences: List[str] = []   # finished sentences of the current paragraph
+        self._last_char = ""              # last character fed so far
+        self._in_break = False            # text so far ends in a sentence break
+        self._started = False
+
+    def feed(self, text: str) -> List[str]:
+        """Adds one snippet's text; returns any paragraphs it completed."""
+        # Timestamps never contain spaces, so stripping them per snippet is
+        # the same as stripping the joined text.
+        piece = TIMESTAMP_RE.sub("", text) if ":" in text else text
+        if self._started:
+            piece = " " + piece
+        self._started = True
+        if not piece:
+            return []
+
+        done: List[str] = []
+        if self._in_break:
+            rest = piece.lstrip(" ")
+            if not rest:
+                return done  # the break's run of spaces continues
+            self._end_sentence(done)
+            self._in_break = False
+            piece = rest
+
+        last_char = self._last_char
+        self._last_char = piece[-1]
+        if "." not in piece and "!" not in piece and "?" not in piece and last_char not in ".!?":
+            self._parts.append(piece)  # fast path: no sentence break possible
+            return done
+
+        # Prefix the previous character so a break that starts right at the
+        # snippet boundary still sees its ``.!?``.
+        scan = last_char + piece
+        start = len(last_char)
+        for match in SENTENCE_BREAK_RE.finditer(scan, start):
+            self._parts.append(scan[start:match.start()])
+            if match.end() == len(scan):
+                # The next snippet may extend this run of spaces.
+                self._in_break = True
+                start = len(scan)
+                break
+            self._end_sentence(done)
+            start = match.end()
+        if start < len(scan):
+            self._parts.append(scan[start:])
+        return done
+
+    def close(self) -> List[str]:
+        """Flushes the final sentence and paragraph."""
+        done: List[str] = []
+        if self._in_break:
+            # re.split yields an empty final segment after a trailing break.
+            self._end_sentence(done)
+            self._in_break = False
+        self._end_sentence(done)
+        if self._sentences:
+            done.append(" ".join(self._sentences))
+            self._sentences = []
+        return done
+
+    def _end_sentence(self, done: List[str]):
+        self._sentences.append("".join(self._parts))
+        self._parts = []
+        if len(self._sentences) >= self.sentences_per_paragraph:
+            done.append(" ".join(self._sentences))
+            self._sentences = []
+
+
+def iter_paragraphs(transcript: Iterable, sentences_per_paragraph: int = SENTENCES_PER_PARAGRAPH) -> Iterator[str]:
+    """Yields paragraphs from an iterable of snippets as they are completed."""
+    builder = ParagraphBuilder(sentences_per_paragraph)
+    for snippet in transcript:
+        yield from builder.feed(snippet_text(snippet))
+    yield from builder.close()
+
+
+def _has_timings(snippet) -> bool:
+    if isinstance(snippet, dict):
+        return "start" in snippet
+    return hasattr(snippet, "start")
+
+
+def _pause_boundaries(starts: Sequence[float], durations: Sequence[float], lengths: Sequence[int],
+                      pause: float, max_chars: int) -> List[int]:
+    """Indices of the snippets that open a new paragraph.
+
+    A snippet opens a paragraph when the silence before it is at least
+    *pause* seconds, or when the characters accumulated since the last pause
+    cross a multiple of *max_chars*.
+    """
+    n = len(starts)
+    np = _numpy()
+    if np is not None:
+        # array('d') inputs (SegmentStore) are wrapped without copying.
+        starts_a = np.asarray(starts, dtype=np.float64)
+        ends_a = starts_a + np.asarray(durations, dtype=np.float64)
+        lengths_a = np.asarray(lengths, dtype=np.int64)
+
+        breaks = np.empty(n, dtype=bool)
+        breaks[0] = True
+        breaks[1:] = (starts_a[1:] - ends_a[:-1]) >= pause
+
+        cumulative = np.cumsum(lengths_a) - lengths_a  # chars before each snippet
+        group = np.cumsum(breaks) - 1
+        before = cumulative - cumulative[breaks][group]  # chars since the last pause
+        bucket = before // max_chars
+        breaks[1:] |= bucket[1:] != bucket[:-1]
+        return np.flatnonzero(breaks).tolist()
+
+    bounds = [0]
+    before = 0
+    prev_end = starts[0] + durations[0]
+    for i in range(1, n):
+        previous = before + lengths[i - 1]
+        if starts[i] - prev_end >= pause:
+            before = 0
+            bounds.append(i)
+        else:
+            if previous // max_chars != before // max_chars:
+                bounds.append(i)
+            before = previous
+        prev_end = starts[i] + durations[i]
+    return bounds
+
+
+def segment_by_pauses(transcript: Sequence, pause: float = PAUSE_SECONDS,
+                      max_chars: int = MAX_PARAGRAPH_CHARS) -> List[str]:
+    """Splits *transcript* into paragraphs at speech pauses and length limits.
+
+    Meant for unpunctuated auto-generated captions; linear in the number of
+    snippets.
+    """
+    if not transcript:
+        return []
+    texts = []
+    if isinstance(transcript, SegmentStore):
+        # Timings are already packed arrays; no per-snippet unpacking needed.
+        starts, durations = transcript.starts, transcript.durations
+        for i in range(len(transcript)):
+            text = transcript.text_of(i)
+            texts.append(TIMESTAMP_RE.sub("", text) if ":" in text else text)
+    else:
+        starts = []
+        durations = []
+        for snippet in transcript:
+            text = snippet_text(snippet)
+            texts.append(TIMESTAMP_RE.sub("", text) if ":" in text else text)
+            start, duration = snippet_timing(snippet)
+            starts.append(start)
+            durations.append(duration)
+    lengths = [len(text) + 1 for text in texts]
+
+    bounds = _pause_boundaries(starts, durations, lengths, pause, max_chars)
+    bounds.append(len(texts))
+    return [" ".join(texts[a:b]) for a, b in zip(bounds, bounds[1:])]
+
+
+def choose_segment_mode(transcript: Sequence) -> str:
+    """Picks "sentences" for punctuated transcripts, "pauses" otherwise."""
+    if not transcript or not _has_timings(transcript[0]):
+        return "sentences"
+    breaks = 0
+    for snippet in transcript:
+        text = snippet_text(snippet)
+        if "." in text or "!" in text or "?" in text:
+            breaks += 1
+    return "sentences" if breaks >= len(transcript) * MIN_SENTENCE_DENSITY else "pauses"
+
+
+def process_transcript(transcript: Iterable, mode: str = "auto") -> List[str]:
+    """Processes the transcript into paragraphs.
+
+    Accepts either dicts or FetchedTranscriptSnippet objects.  *mode* is one
+    of ``SEGMENT_MODES``: "sentences" groups every three sentences, "pauses"
+    uses snippet timings (see ``segment_by_pauses``) and "auto" chooses
+    based on how much punctuation the captions contain."""
+    if mode != "sentences":
+        transcript = transcript if isinstance(transcript, Sequence) else list(transcript)
+        if mode == "auto":
+            mode = choose_segment_mode(transcript)
+        if mode == "pauses":
+            return segment_by_pauses(transcript)
+    return list(iter_paragraphs(transcript))
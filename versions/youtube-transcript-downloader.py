@@ -1,24 +1,7 @@
 import streamlit as st
-from youtube_transcript_api import YouTubeTranscriptApi
-from markdownify import markdownify as md
 import os
-import json
-import requests
-from datetime import timedelta
-
-# Function to get video info
-def get_video_info(video_id):
-    url = f"https://noembed.com/embed?url=https://www.youtube.com/watch?v={video_id}"
-    data = requests.get(url).json()
-    return {
-        "title": data.get("title", "Unknown Title"),
-        "author_name": data.get("author_name", "Unknown Channel"),
-        "thumbnail_url": data.get("thumbnail_url", "")
-    }
-
-# Function to format time
-def format_time(seconds):
-    return str(timedelta(seconds=int(seconds)))
+from transcript_pipeline import TranscriptPipeline, extract_video_id
+from transcript_render import FORMAT_EXTENSIONS, MIME_TYPES
 
 # Title of the Web App
 st.title("YouTube Transcript Downloader")
@@ -57,46 +40,24 @@ download = st.button("Download Transcript")
 def download_transcript(video_url, file_name, save_path, export_format):
     try:
         # Extract the Video ID from the URL
-        if "youtube.com" in video_url:
-            video_id = video_url.split("v=")[-1].split("&")[0]
-        elif "youtu.be" in video_url:
-            video_id = video_url.split("/")[-1]
-        else:
-            video_id = video_url
+        video_id = extract_video_id(video_url)
+        if not video_id:
+            st.error("Invalid YouTube URL or Video ID.")
+            return
+        pipeline = TranscriptPipeline()
 
         # Get video info
-        video_info = get_video_info(video_id)
+        video_info = pipeline.video_info(video_id)
         st.image(video_info['thumbnail_url'], caption=f"{video_info['title']} - {video_info['author_name']}")
 
         # Get available transcript languages
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-        languages = [transcript.language_code for transcript in transcript_list]
+        languages = pipeline.languages(video_id)
         selected_language = st.selectbox("Select transcript language:", languages)
 
-        # Get the transcript
-        transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=[selected_language])
-
-        # Format the transcript based on the selected export format
-        if export_format == "Markdown":
-            formatted_transcript = "# " + video_info['title'] + "\n\n"
-            for fragment in transcript:
-                formatted_transcript += f"**[{format_time(fragment['start'])}]** {fragment['text']}\n\n"
-            file_extension = "md"
-        elif export_format == "Plain Text":
-            formatted_transcript = video_info['title'] + "\n\n"
-            for fragment in transcript:
-                formatted_transcript += f"[{format_time(fragment['start'])}] {fragment['text']}\n\n"
-            file_extension = "txt"
-        elif export_format == "SRT":
-            formatted_transcript = ""
-            for i, fragment in enumerate(transcript, 1):
-                start = format_time(fragment['start'])
-                end = format_time(fragment['start'] + fragment['duration'])
-                formatted_transcript += f"{i}\n{start},000 --> {end},000\n{fragment['text']}\n\n"
-            file_extension = "srt"
-        else:  # JSON
-            formatted_transcript = json.dumps(transcript, indent=2)
-            file_extension = "json"
+        # Get the transcript and format it in the selected export format
+        transcript, paragraphs = pipeline.transcript(video_id, selected_language)
+        file_extension = FORMAT_EXTENSIONS[export_format]
+        formatted_transcript = pipeline.render(file_extension, video_info, paragraphs, transcript)
 
         # Determine the full file path
         if save_path and not os.path.exists(save_path):
@@ -115,7 +76,7 @@ def download_transcript(video_url, file_name, save_path, export_format):
                 label=f"Download {export_format}",
                 data=f.read(),
                 file_name=f"{file_name}.{file_extension}",
-                mime=f"text/{file_extension}"
+                mime=MIME_TYPES[file_extension]
             )
 
     except Exception as e:
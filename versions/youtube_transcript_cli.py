@@ -1,60 +1,6 @@
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
-import requests
-import json
-import re
-from datetime import timedelta
-from transcript_helper import get_transcript_with_fallback
-
-def get_video_info(video_id):
-    try:
-        url = f"https://noembed.com/embed?url=https://www.youtube.com/watch?v={video_id}"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        return {
-            "title": data.get("title", "Unknown Title"),
-            "author_name": data.get("author_name", "Unknown Channel")
-        }
-    except requests.RequestException:
-        return {
-            "title": "Unknown Title",
-            "author_name": "Unknown Channel"
-        }
-
-def process_transcript(transcript):
-    full_text = ' '.join([fragment['text'] for fragment in transcript])
-    full_text = re.sub(r'\[?[0-9]+:[0-9]+\]?', '', full_text)
-    sentences = re.split(r'(?<=[.!?]) +', full_text)
-    
-    paragraphs = []
-    current_paragraph = []
-    for sentence in sentences:
-        current_paragraph.append(sentence)
-        if len(current_paragraph) >= 3:
-            paragraphs.append(' '.join(current_paragraph))
-            current_paragraph = []
-    
-    if current_paragraph:
-        paragraphs.append(' '.join(current_paragraph))
-    
-    return paragraphs
-
-def extract_video_id(url):
-    if re.match(r'^[a-zA-Z0-9_-]{11}$', url):
-        return url
-
-    regex_patterns = [
-        r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?(?:www\.)?youtu\.be/([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?(?:www\.)?youtube\.com/embed/([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?(?:www\.)?youtube\.com/v/([a-zA-Z0-9_-]{11})'
-    ]
-
-    for pattern in regex_patterns:
-        match = re.match(pattern, url)
-        if match:
-            return match.group(1)
-    return None
+from youtube_transcript_api import TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
+from transcript_pipeline import TranscriptPipeline, extract_video_id
+from transcript_render import FORMAT_EXTENSIONS
 
 def save_transcript(formatted_transcript, filename, extension):
     with open(f"{filename}.{extension}", 'w', encoding='utf-8') as f:
@@ -72,15 +18,15 @@ def main():
             break
         print("❌ Invalid YouTube URL or Video ID. Please try again.")
     
+    pipeline = TranscriptPipeline()
     try:
         # Get video info
-        video_info = get_video_info(video_id)
+        video_info = pipeline.video_info(video_id)
         print(f"\n📺 Video: {video_info['title']}")
         print(f"👤 Channel: {video_info['author_name']}")
         
         # Get available languages
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-        languages = [transcript.language_code for transcript in transcript_list]
+        languages = pipeline.languages(video_id)
         
         print("\n🗣️ Available languages:")
         for i, lang in enumerate(languages, 1):
@@ -98,8 +44,7 @@ def main():
                 print("❌ Please enter a valid number.")
         
         # Get transcript
-        transcript = get_transcript_with_fallback(video_id, selected_language)
-        paragraphs = process_transcript(transcript)
+        transcript, paragraphs = pipeline.transcript(video_id, selected_language)
         
         # Select export format
         print("\n📂 Available export formats:")
@@ -121,33 +66,22 @@ def main():
         filename = input("\n📝 Enter file name (without extension): ").strip() or "transcript"
         
         # Format and save transcript
-        if export_format == "Markdown":
-            formatted_transcript = f"# {video_info['title']}\n\n"
-            formatted_transcript += "\n\n".join(paragraphs)
-            extension = "md"
-        elif export_format == "Plain Text":
-            formatted_transcript = f"{video_info['title']}\n\n"
-            formatted_transcript += "\n\n".join(paragraphs)
-            extension = "txt"
-        else:  # JSON
-            formatted_transcript = json.dumps({
-                "title": video_info['title'],
-                "author": video_info['author_name'],
-                "paragraphs": paragraphs
-            }, indent=2)
-            extension = "json"
+        extension = FORMAT_EXTENSIONS[export_format]
+        formatted_transcript = pipeline.render(extension, video_info, paragraphs, transcript)
         
         save_transcript(formatted_transcript, filename, extension)
         print(f"\n✅ Transcript saved as {filename}.{extension}")
         
-    except TranscriptsDisabled:
-        print("❌ Transcripts are disabled for this video.")
-    except NoTranscriptFound:
-        print("❌ No transcripts found for the selected language.")
-    except VideoUnavailable:
-        print("❌ The video is unavailable. Please check the Video ID or URL.")
     except Exception as e:
-        print(f"❌ An unexpected error occurred: {str(e)}")
+        cause = e.__cause__ or e  # fetch errors arrive wrapped by transcript_helper
+        if isinstance(cause, TranscriptsDisabled):
+            print("❌ Transcripts are disabled for this video.")
+        elif isinstance(cause, NoTranscriptFound):
+            print("❌ No transcripts found for the selected language.")
+        elif isinstance(cause, VideoUnavailable):
+            print("❌ The video is unavailable. Please check the Video ID or URL.")
+        else:
+            print(f"❌ An unexpected error occurred: {str(e)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
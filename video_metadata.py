@@ -0,0 +1,122 @@
+"""Shared video metadata lookups over a pooled HTTP session.
+
+Every entry point used to call ``requests.get`` against noembed with a fresh
+connection (and, in places, no timeout).  This module keeps one keep-alive
+``requests.Session`` per process, always applies a timeout, and remembers
+title/author/thumbnail in the persistent metadata cache so repeated batches
+skip the request entirely.  Requests go through the "noembed" budget of
+``rate_limit``, so throttled lookups are retried instead of falling back to
+placeholders.
+"""
+
+import threading
+from typing import TYPE_CHECKING, Optional
+
+import rate_limit
+import run_metrics
+import transcript_cache
+
+NOEMBED_URL = "https://noembed.com/embed"
+DEFAULT_TIMEOUT = 10  # seconds, (connect + read) per request
+POOL_SIZE = 32
+
+UNKNOWN_INFO = {
+    "title": "Unknown Title",
+    "author_name": "Unknown Channel",
+    "thumbnail_url": "",
+}
+
+if TYPE_CHECKING:
+    import requests
+
+_session: Optional["requests.Session"] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """Returns the process-wide HTTP session with a connection pool sized for
+    concurrent batch workers.  ``requests`` is imported here, on first use,
+    so runs served from the metadata cache never load it."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def info_from_playlist_entry(entry: dict) -> Optional[dict]:
+    """Builds a video info dict from a yt-dlp flat playlist entry.
+
+    Returns None when the entry carries no usable title (private or deleted
+    videos, or extractors that only return IDs), so callers fall back to
+    noembed.
+    """
+    title = entry.get("title")
+    if not title or title in ("[Private video]", "[Deleted video]"):
+        return None
+    thumbnails = entry.get("thumbnails") or []
+    return {
+        "title": title,
+        "author_name": entry.get("channel") or entry.get("uploader") or UNKNOWN_INFO["author_name"],
+        "thumbnail_url": thumbnails[-1].get("url", "") if thumbnails else "",
+    }
+
+
+def remember_video_info(video_id: str, info: dict):
+    """Seeds the metadata cache with info obtained elsewhere (e.g. yt-dlp)."""
+    cache = transcript_cache.get_default_metadata_cache()
+    if cache is not None:
+        cache.put(video_id, info)
+
+
+def get_video_info(video_id: str, timeout: float = DEFAULT_TIMEOUT) -> dict:
+    """Fetches title, author and thumbnail for *video_id*.
+
+    Served from the metadata cache when possible; otherwise queried from
+    noembed.  Failed lookups fall back to placeholder values and are not
+    cached, so a later run retries them.
+    """
+    cache = transcript_cache.get_default_metadata_cache()
+    if cache is not None and not transcript_cache.refresh_requested():
+        cached = cache.get(video_id)
+        if cached is not None:
+            run_metrics.count("metadata_cache_hits")
+            return cached
+        run_metrics.count("metadata_cache_misses")
+
+    def query() -> dict:
+        with run_metrics.timed("noembed"):
+            response = get_session().get(
+                NOEMBED_URL,
+                params={"url": f"https://www.youtube.com/watch?v={video_id}"},
+                timeout=timeout,
+            )
+        run_metrics.count("noembed_bytes", len(response.content))
+        response.raise_for_status()
+        return response.json()
+
+    import requests
+
+    try:
+        data = rate_limit.limiter_for("noembed").call(query)
+    except (requests.RequestException, ValueError):
+        return dict(UNKNOWN_INFO)
+
+    if "error" in data or "title" not in data:
+        return dict(UNKNOWN_INFO)
+
+    info = {
+        "title": data.get("title", UNKNOWN_INFO["title"]),
+        "author_name": data.get("author_name", UNKNOWN_INFO["author_name"]),
+        "thumbnail_url": data.get("thumbnail_url", ""),
+    }
+    if cache is not None:
+        cache.put(video_id, info)
+    return info
@@ -6,84 +6,206 @@ Streamlit YouTube Transcript Downloader — fixed for youtube-transcript-api v1.
 • Accepts either list[dict] *or* FetchedTranscriptSnippet objects.
 • Converts to raw data if the helper returns a FetchedTranscript.
 • Dual‑compatible `process_transcript()`.
+• Built on the shared transcript_pipeline, like the CLIs.
+• Fetches are cached across reruns and sessions, so changing the language
+  or format re-renders from memory instead of hitting YouTube again.
+• Downloads go through st.download_button and the preview is paginated, so
+  long transcripts are never inlined into the page.
+• A Batch tab downloads lists and playlists on a background thread pool,
+  shows live progress and offers all outputs as one zip.
 
 Save as `youtube-transcript-downloader2.py`, then run:
 
     streamlit run youtube-transcript-downloader2.py
 """
 
-import base64
 import json
-import re
 from datetime import timedelta
+from typing import List, Tuple
 
-import requests
 import streamlit as st
 from youtube_transcript_api import (
-    YouTubeTranscriptApi,
     TranscriptsDisabled,
     NoTranscriptFound,
     VideoUnavailable,
 )
 
-# ---- helper: fetch with fallback -------------------------------------------
-from transcript_helper import get_transcript_with_fallback
+# ---- shared pipeline: fetch with fallback, caches, renderers ---------------
+from transcript_pipeline import TranscriptPipeline, extract_video_id, is_collection_url
+from transcript_segments import SegmentStore
+from transcript_render import FORMATS, FORMAT_EXTENSIONS, MIME_TYPES
+from batch_job import BatchJob
 
 
-def get_video_info(video_id: str):
-    url = f"https://noembed.com/embed?url=https://www.youtube.com/watch?v={video_id}"
+def format_time(seconds: int):
+    return str(timedelta(seconds=int(seconds)))
+
+
+# ---- cached data --------------------------------------------------------------
+# Widget changes rerun the whole script.  Network results are kept in
+# st.cache_data (shared by every session, expiring after CACHE_TTL), and the
+# parsed transcript in st.cache_resource, so switching language or format
+# only fetches what is new and re-renders the rest from memory.  Rendered
+# output is large and immutable, so it is a cache_resource too, kept once as
+# the UTF-8 bytes the download button sends; preview pages are decoded from
+# those bytes rather than keeping the text a second time.
+CACHE_TTL = timedelta(hours=1)
+PREVIEW_PAGE_BYTES = 3000
+
+
+@st.cache_resource
+def get_pipeline() -> TranscriptPipeline:
+    return TranscriptPipeline()
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_video_info(vid: str) -> dict:
+    return get_pipeline().video_info(vid)
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_languages(vid: str) -> List[str]:
+    return get_pipeline().languages(vid)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=256, show_spinner="Fetching transcript…")
+def cached_snippets(vid: str, lang: str) -> List[dict]:
+    return get_pipeline().snippets(vid, lang)
+
+
+@st.cache_resource(ttl=CACHE_TTL, max_entries=64, show_spinner=False)
+def cached_transcript(vid: str, lang: str) -> Tuple[SegmentStore, List[str]]:
+    """Segment store and paragraphs, shared read-only between sessions."""
+    transcript = SegmentStore.from_snippets(cached_snippets(vid, lang))
+    return transcript, get_pipeline().paragraphs(transcript)
+
+
+@st.cache_resource(ttl=CACHE_TTL, max_entries=128, show_spinner=False)
+def cached_bytes(vid: str, lang: str, ext: str) -> bytes:
+    """The rendered transcript, encoded once: the download and the preview source."""
+    transcript, paragraphs = cached_transcript(vid, lang)
+    return get_pipeline().render(ext, cached_video_info(vid), paragraphs, transcript).encode("utf-8")
+
+
+@st.cache_resource(ttl=CACHE_TTL, max_entries=128, show_spinner=False)
+def cached_page_starts(vid: str, lang: str, ext: str) -> List[int]:
+    """Byte offsets of preview pages of about PREVIEW_PAGE_BYTES, cut at line
+    breaks (or else between characters)."""
+    content = cached_bytes(vid, lang, ext)
+    starts = [0]
+    while len(content) - starts[-1] > PREVIEW_PAGE_BYTES:
+        pos = starts[-1]
+        cut = content.rfind(b"\n", pos + 1, pos + PREVIEW_PAGE_BYTES)
+        if cut > pos:
+            starts.append(cut + 1)
+            continue
+        cut = pos + PREVIEW_PAGE_BYTES
+        while content[cut] & 0xC0 == 0x80:  # not inside a UTF-8 sequence
+            cut -= 1
+        starts.append(cut)
+    return starts
+
+
+def show_preview(vid: str, lang: str, ext: str):
+    """Shows one page of the rendered transcript; only that page is decoded and
+    sent to the browser."""
+    content = cached_bytes(vid, lang, ext)
+    starts = cached_page_starts(vid, lang, ext)
+    page = 1
+    if len(starts) > 1:
+        page = st.number_input(f"Page (of {len(starts)})", min_value=1, max_value=len(starts),
+                               key=f"page_{vid}_{lang}_{ext}")
+    end = starts[page] if page < len(starts) else len(content)
+    if ext == "json" and len(starts) == 1:
+        st.json(json.loads(content))
+    else:
+        st.text(content[starts[page - 1]:end].decode("utf-8"))
+
+
+def show_transcript(vid: str, fname: str, fmt: str):
     try:
-        data = requests.get(url, timeout=10).json()
-    except requests.RequestException:
-        data = {}
-    return {
-        "title": data.get("title", "Unknown Title"),
-        "author_name": data.get("author_name", "Unknown Channel"),
-        "thumbnail_url": data.get("thumbnail_url", ""),
-    }
+        info = cached_video_info(vid)
+        if info["thumbnail_url"]:
+            st.image(info["thumbnail_url"], caption=f"{info['title']} – {info['author_name']}")  # noqa: E501
 
+        langs = cached_languages(vid)
+        default = langs.index("en") if "en" in langs else 0
+        sel_lang = st.selectbox("🗣️ Select transcript language:", langs, index=default, key=f"lang_{vid}")
 
-def format_time(seconds: int):
-    return str(timedelta(seconds=int(seconds)))
+        ext = FORMAT_EXTENSIONS[fmt]
+        st.download_button(
+            "📥 Download transcript",
+            data=cached_bytes(vid, sel_lang, ext),
+            file_name=f"{fname}.{ext}",
+            mime=MIME_TYPES[ext],
+        )
 
+        st.subheader("📝 Transcript Preview")
+        show_preview(vid, sel_lang, ext)
 
-def process_transcript(transcript):
-    """Return paragraphs from *transcript*.
-
-    Accepts either dicts or FetchedTranscriptSnippet objects."""
-    texts = [
-        getattr(frag, "text", frag.get("text", "")) for frag in transcript
-    ]
-    full_text = " ".join(texts)
-    full_text = re.sub(r"\[?[0-9]+:[0-9]+\]?", "", full_text)
-
-    sentences = re.split(r"(?<=[.!?]) +", full_text)
-
-    paragraphs, current = [], []
-    for sentence in sentences:
-        current.append(sentence)
-        if len(current) >= 3:
-            paragraphs.append(" ".join(current))
-            current = []
-    if current:
-        paragraphs.append(" ".join(current))
-    return paragraphs
-
-
-def extract_video_id(url: str):
-    if re.match(r"^[a-zA-Z0-9_-]{11}$", url):
-        return url
-    pats = [
-        r"(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})",
-        r"(?:https?://)?(?:www\.)?youtu\.be/([a-zA-Z0-9_-]{11})",
-        r"(?:https?://)?(?:www\.)?youtube\.com/embed/([a-zA-Z0-9_-]{11})",
-        r"(?:https?://)?(?:www\.)?youtube\.com/v/([a-zA-Z0-9_-]{11})",
-    ]
-    for pat in pats:
-        m = re.match(pat, url)
-        if m:
-            return m.group(1)
-    return None
+    except Exception as exc:
+        cause = exc.__cause__ or exc  # fetch errors arrive wrapped by transcript_helper
+        if isinstance(cause, TranscriptsDisabled):
+            st.error("❌ Transcripts are disabled for this video.")
+        elif isinstance(cause, NoTranscriptFound):
+            st.error("❌ No transcripts found for the selected language.")
+        elif isinstance(cause, VideoUnavailable):
+            st.error("❌ The video is unavailable.")
+        else:
+            st.error(f"❌ An unexpected error occurred: {exc}")
+
+
+def parse_batch_inputs(lines: List[str]) -> List[str]:
+    """Video IDs and playlist/channel URLs from user input; anything else is dropped."""
+    inputs = []
+    for line in lines:
+        line = line.strip()
+        vid = extract_video_id(line)
+        if vid:
+            inputs.append(vid)
+        elif is_collection_url(line):
+            inputs.append(line)
+    return inputs
+
+
+PROGRESS_ROWS = 100  # latest rows shown while a batch runs; the full table comes at the end
+
+
+def show_batch_rows(rows: List[dict]):
+    if rows:
+        st.dataframe(
+            [{"Video": row["video_id"], "Title": row["title"], "Result": row["message"]} for row in rows],
+            use_container_width=True,
+        )
+
+
+@st.fragment(run_every=1.0)
+def show_batch_progress():
+    """Polls the running job once a second without rerunning the page; once it
+    has finished, reruns the page once so the result is shown without polling."""
+    job = st.session_state.batch_job
+    progress = job.progress()
+    if not progress["running"]:
+        st.rerun()
+    st.info(f"⏳ {progress['done']} done ({progress['failed']} failed) in {progress['elapsed']:.0f}s, "
+            f"{progress['per_minute']:.1f} videos/min")
+    if st.button("⏹️ Stop after current downloads"):
+        job.cancel()
+    show_batch_rows(progress["rows"][-PROGRESS_ROWS:])
+
+
+def show_batch_result():
+    """Summary, zip download and every row of the finished job."""
+    job = st.session_state.batch_job
+    progress = job.progress()
+    st.success(f"📊 Processed {progress['done']} videos: {progress['saved']} saved, "
+               f"{progress['failed']} failed in {progress['elapsed']:.0f}s ({progress['per_minute']:.1f} videos/min).")
+    if progress["error"]:
+        st.error(f"❌ The batch stopped early: {progress['error']}")
+    if progress["saved"]:
+        st.download_button("📦 Download all (zip)", data=job.zip_bytes(),
+                           file_name="transcripts.zip", mime="application/zip")
+    show_batch_rows(progress["rows"])
 
 
 # ---- Streamlit UI -----------------------------------------------------------
@@ -104,78 +226,51 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-video_url = st.text_input("🔗 Enter YouTube Video URL or Video ID:")
-file_name = st.text_input("📝 Enter file name (without extension):", "transcript")
-export_format = st.selectbox("📂 Select export format:", ["Markdown", "Plain Text", "JSON"])
-download = st.button("⬇️ Download Transcript")
+single_tab, batch_tab = st.tabs(["🎬 Single video", "📚 Batch"])
 
+with single_tab:
+    video_url = st.text_input("🔗 Enter YouTube Video URL or Video ID:")
+    file_name = st.text_input("📝 Enter file name (without extension):", "transcript")
+    export_format = st.selectbox("📂 Select export format:", list(FORMATS.values()))
+    download = st.button("⬇️ Download Transcript")
 
-def download_transcript(url: str, fname: str, fmt: str):
-    try:
-        vid = extract_video_id(url)
-        if not vid:
+    if download:
+        if not video_url:
+            st.error("❌ Please enter a YouTube Video URL or Video ID.")
+        elif not file_name:
+            st.error("❌ Please enter a valid file name.")
+        elif not extract_video_id(video_url.strip()):
             st.error("❌ Invalid YouTube URL or Video ID.")
-            return
-
-        info = get_video_info(vid)
-        if info["thumbnail_url"]:
-            st.image(info["thumbnail_url"], caption=f"{info['title']} – {info['author_name']}")  # noqa: E501
-
-        tlist = YouTubeTranscriptApi.list_transcripts(vid)
-        langs = [tr.language_code for tr in tlist]
-        sel_lang = st.selectbox("🗣️ Select transcript language:", langs)
-
-        transcript = get_transcript_with_fallback(vid, sel_lang)
-
-        # if helper returned a FetchedTranscript, convert:
-        if hasattr(transcript, "to_raw_data"):
-            transcript = transcript.to_raw_data()
-
-        paragraphs = process_transcript(transcript)
-
-        if fmt == "Markdown":
-            content = f"# {info['title']}\n\n" + "\n\n".join(paragraphs)
-            ext = "md"
-            mime = "text/markdown"
-        elif fmt == "Plain Text":
-            content = f"{info['title']}\n\n" + "\n\n".join(paragraphs)
-            ext = "txt"
-            mime = "text/plain"
         else:
-            content = json.dumps(
-                {"title": info['title'], "author": info['author_name'], "paragraphs": paragraphs},
-                indent=2,
-            )
-            ext = "json"
-            mime = "application/json"
-
-        b64 = base64.b64encode(content.encode()).decode()
-        href = f'<a href="data:{mime};base64,{b64}" download="{fname}.{ext}">📥 Click here to download your transcript</a>'  # noqa: E501
-        st.markdown(href, unsafe_allow_html=True)
-
-        # preview
-        st.subheader("📝 Transcript Preview")
-        preview_len = 1000
-        if fmt == "JSON" and len(content) <= preview_len:
-            st.json(json.loads(content))
+            # remembered across reruns, so later widget changes keep the video loaded
+            st.session_state.video_id = extract_video_id(video_url.strip())
+
+    if st.session_state.get("video_id") and file_name:
+        show_transcript(st.session_state.video_id, file_name.strip(), export_format)
+
+with batch_tab:
+    pasted = st.text_area("🔗 Video URLs/IDs or playlist URLs, one per line:")
+    uploaded = st.file_uploader("📄 …or upload a text file with one per line:", type=["txt"])
+    batch_lang = st.text_input("🗣️ Transcript language code:", "en", key="batch_lang")
+    batch_formats = st.multiselect("📂 Export formats:", list(FORMATS.values()), default=["Markdown"])
+    batch_workers = st.slider("⚙️ Parallel downloads:", 1, 16, 4)
+    job = st.session_state.get("batch_job")
+
+    if st.button("🚀 Start batch", disabled=job is not None and job.running):
+        lines = pasted.splitlines()
+        if uploaded is not None:
+            lines += uploaded.getvalue().decode("utf-8", "replace").splitlines()
+        inputs = parse_batch_inputs(lines)
+        if not inputs:
+            st.error("❌ No valid YouTube video IDs or playlist URLs found.")
+        elif not batch_formats:
+            st.error("❌ Please select at least one export format.")
         else:
-            st.text((content[:preview_len] + "...") if len(content) > preview_len else content)
-
-    except TranscriptsDisabled:
-        st.error("❌ Transcripts are disabled for this video.")
-    except NoTranscriptFound:
-        st.error("❌ No transcripts found for the selected language.")
-    except VideoUnavailable:
-        st.error("❌ The video is unavailable.")
-    except Exception as exc:
-        st.error(f"❌ An unexpected error occurred: {exc}")
-
-
-if download:
-    if not video_url:
-        st.error("❌ Please enter a YouTube Video URL or Video ID.")
-    elif not file_name:
-        st.error("❌ Please enter a valid file name.")
-    else:
-        download_transcript(video_url.strip(), file_name.strip(), export_format)
-
+            exts = [FORMAT_EXTENSIONS[fmt] for fmt in batch_formats]
+            st.session_state.batch_job = BatchJob(inputs, batch_lang.strip() or "en", exts, batch_workers).start()
+
+    job = st.session_state.get("batch_job")
+    if job is not None and job.running:
+        show_batch_progress()
+    elif job is not None:
+        show_batch_result()